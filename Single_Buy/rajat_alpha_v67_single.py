@@ -49,13 +49,18 @@ REQUIREMENTS:
 ================================================================================
 """
 
+import os
 import json
 import time
 import math
+import heapq
 import sqlite3
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, FrozenSet
+import numpy as np
 import pandas as pd
 import pandas_ta as ta
 import pytz
@@ -131,6 +136,55 @@ logger.addHandler(audit_handler)
 # DATABASE SETUP (Position Tracking)
 # ================================================================================
 
+# Hot-path SQL kept as module-level constants so every call hands sqlite3 the
+# same string and hits its prepared-statement cache instead of re-parsing
+SQL_OPEN_POSITIONS = '''
+    SELECT * FROM positions 
+    WHERE status = 'OPEN'
+    ORDER BY entry_date ASC
+'''
+SQL_OPEN_POSITIONS_BY_SYMBOL = '''
+    SELECT * FROM positions 
+    WHERE symbol = ? AND status = 'OPEN'
+    ORDER BY entry_date ASC
+'''
+SQL_OPEN_UTILIZATION = '''
+    SELECT COALESCE(SUM(entry_price * remaining_qty), 0.0) FROM positions 
+    WHERE status = 'OPEN'
+'''
+SQL_OPEN_UTILIZATION_BY_SYMBOL = '''
+    SELECT COALESCE(SUM(entry_price * remaining_qty), 0.0) FROM positions 
+    WHERE symbol = ? AND status = 'OPEN'
+'''
+SQL_POSITION_BY_ID = 'SELECT * FROM positions WHERE id = ?'
+SQL_UPDATE_STOP_LOSS = 'UPDATE positions SET stop_loss = ? WHERE id = ?'
+SQL_PARTIAL_EXIT_TAKEN = '''
+    SELECT COUNT(*) FROM partial_exits 
+    WHERE position_id = ? AND profit_target = ?
+'''
+SQL_COUNT_TRADES_ON_DATE = '''
+    SELECT COUNT(*) FROM positions 
+    WHERE date(entry_date) = ?
+'''
+SQL_COUNT_OPEN_SYMBOL_ON_DATE = '''
+    SELECT COUNT(*) FROM positions 
+    WHERE symbol = ? AND status = 'OPEN' AND date(entry_date) = ?
+'''
+SQL_INSERT_SIGNAL = '''
+    INSERT OR REPLACE INTO signal_history (symbol, signal_date, score, pattern, price, reason, executed)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+SQL_EXIT_TRIGGERS = '''
+    SELECT p.id,
+           t.price <= p.stop_loss AS stop_hit,
+           julianday('now', 'localtime') - julianday(p.entry_date) >= ? AS time_hit
+    FROM positions p
+    JOIN tick_prices t ON p.symbol = t.symbol
+    WHERE p.status = 'OPEN'
+      AND (t.price <= p.stop_loss
+           OR julianday('now', 'localtime') - julianday(p.entry_date) >= ?)
+'''
+
 class PositionDatabase:
     """
     SQLite database to track:
@@ -141,7 +195,17 @@ class PositionDatabase:
     """
     
     def __init__(self, db_path='db/positions.db'):
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        # WAL + synchronous=NORMAL: commits no longer fsync the main DB file,
+        # which keeps per-trade write latency low while staying crash-safe
+        journal_mode = self.conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        if journal_mode.lower() != 'wal' and db_path != ':memory:':
+            # e.g. network filesystems; readers will block the bot's writes
+            # (in-memory DBs never support WAL, so there is nothing to warn about)
+            logger.warning(f"SQLite WAL unavailable for {db_path}, using journal_mode={journal_mode}")
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute('PRAGMA mmap_size=268435456')
         self.create_tables()
     
     def create_tables(self):
@@ -197,44 +261,65 @@ class PositionDatabase:
             )
         ''')
         
+        # Indexes for the date/status filtered lookups made by the bot and the
+        # reporting scripts (signal_dashboard, db_manager, stock_analyzer)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sig_date_score
+            ON signal_history(signal_date, score DESC, created_at DESC)
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sig_created ON signal_history(created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pos_status_entry ON positions(status, entry_date)')
+        # Covers db_manager's per-score performance breakdown
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_pos_status_score_round
+            ON positions(status, ROUND(score), profit_loss_pct)
+        ''')
+        
+        # Per-connection scratch table holding the current tick's prices
+        cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS tick_prices (
+                symbol TEXT PRIMARY KEY,
+                price REAL NOT NULL
+            )
+        ''')
+        
         self.conn.commit()
     
     def add_position(self, symbol: str, entry_price: float, quantity: int, 
                      stop_loss: float, score: float, pattern: str = 'Unknown') -> int:
         """Add new position to database with pattern tracking"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO positions (symbol, entry_date, entry_price, quantity, 
-                                   remaining_qty, stop_loss, score, pattern)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (symbol, datetime.now().isoformat(), entry_price, quantity, 
-              quantity, stop_loss, score, pattern))
-        self.conn.commit()
+        with self.conn:
+            cursor = self.conn.execute('''
+                INSERT INTO positions (symbol, entry_date, entry_price, quantity, 
+                                       remaining_qty, stop_loss, score, pattern)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (symbol, datetime.now().isoformat(), entry_price, quantity, 
+                  quantity, stop_loss, score, pattern))
         return cursor.lastrowid
     
     def get_open_positions(self, symbol: Optional[str] = None) -> List[Dict]:
         """Get all open positions (FIFO order)"""
         cursor = self.conn.cursor()
         if symbol:
-            cursor.execute('''
-                SELECT * FROM positions 
-                WHERE symbol = ? AND status = 'OPEN'
-                ORDER BY entry_date ASC
-            ''', (symbol,))
+            cursor.execute(SQL_OPEN_POSITIONS_BY_SYMBOL, (symbol,))
         else:
-            cursor.execute('''
-                SELECT * FROM positions 
-                WHERE status = 'OPEN'
-                ORDER BY entry_date ASC
-            ''')
+            cursor.execute(SQL_OPEN_POSITIONS)
         
         columns = [desc[0] for desc in cursor.description]
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
+    def get_utilization_usd(self, symbol: Optional[str] = None) -> float:
+        """Capital tied up in open positions (entry_price * remaining_qty), summed in SQL"""
+        if symbol:
+            row = self.conn.execute(SQL_OPEN_UTILIZATION_BY_SYMBOL, (symbol,)).fetchone()
+        else:
+            row = self.conn.execute(SQL_OPEN_UTILIZATION).fetchone()
+        return float(row[0])
+    
     def get_position_by_id(self, position_id: int) -> Optional[Dict]:
         """Get a specific position by ID"""
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM positions WHERE id = ?', (position_id,))
+        cursor.execute(SQL_POSITION_BY_ID, (position_id,))
         row = cursor.fetchone()
         if row:
             columns = [desc[0] for desc in cursor.description]
@@ -243,63 +328,71 @@ class PositionDatabase:
     
     def update_stop_loss(self, position_id: int, new_stop_loss: float):
         """Update trailing stop loss"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            UPDATE positions SET stop_loss = ? WHERE id = ?
-        ''', (new_stop_loss, position_id))
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute(SQL_UPDATE_STOP_LOSS, (new_stop_loss, position_id))
     
     def add_partial_exit(self, position_id: int, quantity: int, exit_price: float,
                         profit_target: str, profit_pct: float):
-        """Record partial exit"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO partial_exits (position_id, exit_date, quantity, 
-                                       exit_price, profit_target, profit_pct)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (position_id, datetime.now().isoformat(), quantity, exit_price,
-              profit_target, profit_pct))
-        
-        # Update remaining quantity
-        cursor.execute('''
-            UPDATE positions 
-            SET remaining_qty = remaining_qty - ?
-            WHERE id = ?
-        ''', (quantity, position_id))
-        self.conn.commit()
+        """Record partial exit (exit row + remaining_qty update in one transaction)"""
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO partial_exits (position_id, exit_date, quantity, 
+                                           exit_price, profit_target, profit_pct)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (position_id, datetime.now().isoformat(), quantity, exit_price,
+                  profit_target, profit_pct))
+            
+            # Update remaining quantity
+            self.conn.execute('''
+                UPDATE positions 
+                SET remaining_qty = remaining_qty - ?
+                WHERE id = ?
+            ''', (quantity, position_id))
     
     def close_position(self, position_id: int, exit_price: float, exit_reason: str):
-        """Close position completely"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT entry_price, remaining_qty FROM positions WHERE id = ?
-        ''', (position_id,))
-        entry_price, remaining_qty = cursor.fetchone()
+        """Close position completely (P/L computed in the same UPDATE statement)"""
+        with self.conn:
+            self.conn.execute('''
+                UPDATE positions 
+                SET status = 'CLOSED', 
+                    exit_date = ?,
+                    exit_price = ?,
+                    profit_loss_pct = (? - entry_price) / entry_price * 100,
+                    exit_reason = ?,
+                    remaining_qty = 0
+                WHERE id = ?
+            ''', (datetime.now().isoformat(), exit_price, exit_price, 
+                  exit_reason, position_id))
+    
+    def has_partial_exit(self, position_id: int, profit_target: str) -> bool:
+        """Check whether a partial exit target was already taken for a position"""
+        cursor = self.conn.execute(SQL_PARTIAL_EXIT_TAKEN, (position_id, profit_target))
+        return cursor.fetchone()[0] > 0
+    
+    def get_exit_triggers(self, prices: Dict[str, float], max_hold_days: int) -> Dict[int, str]:
+        """
+        Find open positions that need a full exit at the given prices
         
-        profit_loss_pct = (exit_price - entry_price) / entry_price * 100
+        Uploads the tick's prices into the tick_prices temp table and lets a
+        single query pick out stop loss hits and TES (max hold days) hits.
         
-        cursor.execute('''
-            UPDATE positions 
-            SET status = 'CLOSED', 
-                exit_date = ?,
-                exit_price = ?,
-                profit_loss_pct = ?,
-                exit_reason = ?,
-                remaining_qty = 0
-            WHERE id = ?
-        ''', (datetime.now().isoformat(), exit_price, profit_loss_pct, 
-              exit_reason, position_id))
-        self.conn.commit()
-    
-    def get_days_held(self, position_id: int) -> int:
-        """Calculate days held for TES check"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT entry_date FROM positions WHERE id = ?
-        ''', (position_id,))
-        entry_date_str = cursor.fetchone()[0]
-        entry_date = datetime.fromisoformat(entry_date_str)
-        return (datetime.now() - entry_date).days
+        Args:
+            prices: {symbol: current_price} for this tick
+            max_hold_days: TES threshold in days
+            
+        Returns:
+            {position_id: 'Stop Loss' | 'TES'} - stop loss takes priority
+        """
+        with self.conn:
+            self.conn.execute('DELETE FROM tick_prices')
+            self.conn.executemany('INSERT INTO tick_prices (symbol, price) VALUES (?, ?)',
+                                  prices.items())
+        
+        triggers = {}
+        for position_id, stop_hit, time_hit in self.conn.execute(
+                SQL_EXIT_TRIGGERS, (max_hold_days, max_hold_days)):
+            triggers[position_id] = 'Stop Loss' if stop_hit else 'TES'
+        return triggers
     
     def count_trades_today(self) -> int:
         """
@@ -317,10 +410,7 @@ class PositionDatabase:
         """
         today_date = datetime.now().date().isoformat()
         cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT COUNT(*) FROM positions 
-            WHERE date(entry_date) = ?
-        ''', (today_date,))
+        cursor.execute(SQL_COUNT_TRADES_ON_DATE, (today_date,))
         return cursor.fetchone()[0]
     
     def was_traded_today(self, symbol: str) -> bool:
@@ -342,13 +432,38 @@ class PositionDatabase:
         """
         today_date = datetime.now().date().isoformat()
         cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT COUNT(*) FROM positions 
-            WHERE symbol = ? AND status = 'OPEN' AND date(entry_date) = ?
-        ''', (symbol, today_date))
+        cursor.execute(SQL_COUNT_OPEN_SYMBOL_ON_DATE, (symbol, today_date))
         count = cursor.fetchone()[0]
         return count > 0
     
+    def count_open_positions_by_symbol(self) -> Dict[str, int]:
+        """
+        Count open positions per symbol in one GROUP BY query
+        
+        Returns:
+            Dict[str, int]: {symbol: open position count}, symbols with none omitted
+        """
+        cursor = self.conn.execute('''
+            SELECT symbol, COUNT(*) FROM positions 
+            WHERE status = 'OPEN'
+            GROUP BY symbol
+        ''')
+        return dict(cursor.fetchall())
+    
+    def get_symbols_traded_today(self) -> set:
+        """
+        Symbols with open positions opened today (batch form of was_traded_today)
+        
+        Returns:
+            set: Symbols for which was_traded_today() would return True
+        """
+        today_date = datetime.now().date().isoformat()
+        cursor = self.conn.execute('''
+            SELECT DISTINCT symbol FROM positions 
+            WHERE status = 'OPEN' AND date(entry_date) = ?
+        ''', (today_date,))
+        return {row[0] for row in cursor}
+    
     def log_signal(self, symbol: str, signal_details: Dict, executed: bool):
         """
         Log signal to history for analysis and debugging
@@ -376,17 +491,40 @@ class PositionDatabase:
             logger.debug(f"[{symbol}] Skipping signal logging - invalid score: {score}")
             return
 
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO signal_history (symbol, signal_date, score, pattern, price, reason, executed)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (symbol, datetime.now().date().isoformat(), score,
-              signal_details.get('pattern', 'None'), signal_details.get('price', 0),
-              signal_details.get('reason', ''), executed))
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute(SQL_INSERT_SIGNAL, self._signal_row(
+                symbol, signal_details, executed, datetime.now().date().isoformat()))
 
         logger.debug(f"[{symbol}] Signal logged to history (Score: {score}, Executed: {executed})")
     
+    def log_signals_batch(self, entries: List[Tuple[str, Dict, bool]]) -> int:
+        """
+        Log many signals to history in a single transaction
+        Same rules as log_signal (only scores > 0 are stored)
+        
+        Args:
+            entries: [(symbol, signal_details, executed), ...]
+            
+        Returns:
+            int: Number of rows written
+        """
+        signal_date = datetime.now().date().isoformat()
+        rows = [self._signal_row(symbol, signal_details, executed, signal_date)
+                for symbol, signal_details, executed in entries
+                if signal_details.get('score', 0) > 0]
+        if rows:
+            with self.conn:
+                self.conn.executemany(SQL_INSERT_SIGNAL, rows)
+        logger.debug(f"Signal history batch logged ({len(rows)}/{len(entries)} signals)")
+        return len(rows)
+    
+    @staticmethod
+    def _signal_row(symbol: str, signal_details: Dict, executed: bool, signal_date: str) -> Tuple:
+        """Build a signal_history row in SQL_INSERT_SIGNAL column order"""
+        return (symbol, signal_date, signal_details.get('score', 0),
+                signal_details.get('pattern', 'None'), signal_details.get('price', 0),
+                signal_details.get('reason', ''), executed)
+    
     def get_performance_by_score(self) -> List[Dict]:
         """
         Analyze performance grouped by entry score
@@ -571,6 +709,10 @@ class ConfigManager:
         if section_data is None:
             return default
         return section_data.get(key, default)
+    
+    def get_section(self, section) -> Dict:
+        """Get a whole configuration section (empty dict if missing)"""
+        return self.config.get(section) or {}
 
 # ================================================================================
 # MARKET DATA FETCHER
@@ -618,6 +760,20 @@ class MarketDataFetcher:
             logger.error(f"Error fetching daily bars for {symbol}: {e}")
             return None
     
+    def prefetch_daily_bars(self, symbols: List[str], days: int = 365, max_workers: int = 16):
+        """
+        Warm the daily bar cache for many symbols concurrently
+        
+        Bar requests are network-bound, so overlapping them in a thread pool
+        cuts a watchlist scan from N sequential round trips to ~N/max_workers.
+        Analysis itself stays single-threaded and reads from the cache.
+        """
+        if not symbols:
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # get_daily_bars logs and swallows its own errors
+            list(executor.map(lambda symbol: self.get_daily_bars(symbol, days=days), symbols))
+    
     def get_weekly_bars(self, df_daily: pd.DataFrame) -> pd.DataFrame:
         """Aggregate daily bars to weekly"""
         logic = {
@@ -649,16 +805,73 @@ class MarketDataFetcher:
         except Exception as e:
             logger.error(f"Error fetching current price for {symbol}: {e}")
             return None
+    
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Get latest prices for many symbols with one multi-symbol request
+        Symbols without a bar in the response are omitted from the result
+        """
+        if not symbols:
+            return {}
+        try:
+            params = StockLatestBarRequest(symbol_or_symbols=list(symbols))
+            bars = self.data_client.get_stock_latest_bar(params)
+            return {symbol: float(bar.close) for symbol, bar in bars.items()}
+        except Exception as e:
+            logger.error(f"Error fetching current prices for {len(symbols)} symbols: {e}")
+            return {}
 
 # ================================================================================
 # PATTERN RECOGNITION
 # ================================================================================
 
 class PatternDetector:
-    """Detects explosive bullish candle patterns"""
+    """
+    Detects explosive bullish candle patterns
+    
+    The _is_* kernels take open/high/low/close arrays (previous candle at
+    [-2], current at [-1]) and combine comparisons elementwise, so the same
+    code checks one symbol (1-D arrays -> np.bool_) or a whole batch
+    (bars x symbols arrays -> bool per symbol). The DataFrame wrappers hand
+    them the column arrays instead of building a Series per iloc row.
+    """
+    
+    @staticmethod
+    def _ohlc(df: pd.DataFrame) -> Tuple[np.ndarray, ...]:
+        """Open, high, low, close columns as arrays (views, no copy of the frame)"""
+        return tuple(df[col].to_numpy() for col in ('open', 'high', 'low', 'close'))
+    
+    @staticmethod
+    def _is_engulfing(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
+        is_green = c[-1] > o[-1]
+        prev_is_red = c[-2] < o[-2]
+        return is_green & (c[-1] >= o[-2]) & prev_is_red
+    
+    @staticmethod
+    def _is_piercing(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
+        is_green = c[-1] > o[-1]
+        prev_is_red = c[-2] < o[-2]
+        
+        midpoint = (o[-2] + c[-2]) / 2
+        is_classic_piercing = (c[-1] > midpoint) & (c[-1] < o[-2]) & prev_is_red
+        
+        # Check explosive body (zero ranges are masked out after the division)
+        candle_range = h[-1] - l[-1]
+        body_size = c[-1] - o[-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            is_explosive = (candle_range > 0) & ((body_size / candle_range) >= 0.40)
+        
+        return is_green & is_classic_piercing & is_explosive
     
     @staticmethod
-    def is_engulfing(df: pd.DataFrame) -> bool:
+    def _is_tweezer_bottom(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
+        is_green = c[-1] > o[-1]
+        prev_is_red = c[-2] < o[-2]
+        low_match = abs(l[-1] - l[-2]) <= (l[-1] * 0.002)
+        return is_green & low_match & prev_is_red
+    
+    @classmethod
+    def is_engulfing(cls, df: pd.DataFrame) -> bool:
         """
         Engulfing Pattern:
         - Today's close >= yesterday's open
@@ -666,41 +879,17 @@ class PatternDetector:
         """
         if len(df) < 2:
             return False
-        
-        curr = df.iloc[-1]
-        prev = df.iloc[-2]
-        
-        is_green = curr['close'] > curr['open']
-        prev_is_red = prev['close'] < prev['open']
-        
-        return is_green and (curr['close'] >= prev['open']) and prev_is_red
+        return bool(cls._is_engulfing(*cls._ohlc(df)))
     
-    @staticmethod
-    def is_piercing(df: pd.DataFrame) -> bool:
+    @classmethod
+    def is_piercing(cls, df: pd.DataFrame) -> bool:
         """Piercing Pattern with Explosive Body"""
         if len(df) < 2:
             return False
-        
-        curr = df.iloc[-1]
-        prev = df.iloc[-2]
-        
-        is_green = curr['close'] > curr['open']
-        prev_is_red = prev['close'] < prev['open']
-        
-        midpoint = (prev['open'] + prev['close']) / 2
-        is_classic_piercing = (curr['close'] > midpoint) and \
-                             (curr['close'] < prev['open']) and \
-                             prev_is_red
-        
-        # Check explosive body
-        candle_range = curr['high'] - curr['low']
-        body_size = curr['close'] - curr['open']
-        is_explosive = (body_size / candle_range) >= 0.40 if candle_range > 0 else False
-        
-        return is_green and is_classic_piercing and is_explosive
+        return bool(cls._is_piercing(*cls._ohlc(df)))
     
-    @staticmethod
-    def is_tweezer_bottom(df: pd.DataFrame) -> bool:
+    @classmethod
+    def is_tweezer_bottom(cls, df: pd.DataFrame) -> bool:
         """
         Tweezer Bottom:
         - Today's low within 0.2% of yesterday's low
@@ -708,16 +897,7 @@ class PatternDetector:
         """
         if len(df) < 2:
             return False
-        
-        curr = df.iloc[-1]
-        prev = df.iloc[-2]
-        
-        is_green = curr['close'] > curr['open']
-        prev_is_red = prev['close'] < prev['open']
-        
-        low_match = abs(curr['low'] - prev['low']) <= (curr['low'] * 0.002)
-        
-        return is_green and low_match and prev_is_red
+        return bool(cls._is_tweezer_bottom(*cls._ohlc(df)))
     
     @classmethod
     def has_pattern(cls, df: pd.DataFrame) -> Tuple[bool, str]:
@@ -725,13 +905,29 @@ class PatternDetector:
         Check for ANY explosive pattern (MANDATORY for entry)
         Returns: (pattern_found, pattern_name)
         """
-        if cls.is_engulfing(df):
+        if len(df) < 2:
+            return False, "None"
+        
+        ohlc = cls._ohlc(df)
+        if cls._is_engulfing(*ohlc):
             return True, "Engulfing"
-        if cls.is_piercing(df):
+        if cls._is_piercing(*ohlc):
             return True, "Piercing"
-        if cls.is_tweezer_bottom(df):
+        if cls._is_tweezer_bottom(*ohlc):
             return True, "Tweezer"
         return False, "None"
+    
+    @classmethod
+    def scan_batch(cls, ohlc_batch: np.ndarray) -> np.ndarray:
+        """
+        Check many symbols at once for ANY explosive pattern
+        ohlc_batch: (n_symbols, n_bars, 4) array of open/high/low/close, n_bars >= 2
+        Returns: (n_symbols,) bool mask, same verdict as has_pattern per symbol
+        """
+        # Last two bars as four (2, n_symbols) arrays, so [-1]/[-2] pick bars
+        o, h, l, c = np.asarray(ohlc_batch, dtype=float)[:, -2:, :].transpose(2, 1, 0)
+        return (cls._is_engulfing(o, h, l, c) | cls._is_piercing(o, h, l, c)
+                | cls._is_tweezer_bottom(o, h, l, c))
 
 # ================================================================================
 # STRATEGY ANALYZER (Core Rajat Alpha v67 Logic)
@@ -752,12 +948,23 @@ class RajatAlphaAnalyzer:
         self.touch_sma50_count = 0
     
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add all required technical indicators"""
+        """
+        Add all required technical indicators
+        
+        Daily frames come from MarketDataFetcher's 5-minute cache, so re-validating
+        a queued signal hands back the same frame; the indicators are stamped with
+        the bars they were computed for and not recomputed until those change.
+        """
+        stamp = (len(df), df.index[-1]) if len(df) else None
+        if stamp is not None and df.attrs.get('indicators_for') == stamp:
+            return df
+        
         df['SMA50'] = ta.sma(df['close'], length=50)
         df['SMA200'] = ta.sma(df['close'], length=200)
         df['EMA21'] = ta.ema(df['close'], length=21)
         df['VOL_SMA21'] = ta.sma(df['volume'], length=21)
         df['RSI14'] = ta.rsi(df['close'], length=14)
+        df.attrs['indicators_for'] = stamp
         return df
     
     def update_touch_tracking(self, df: pd.DataFrame):
@@ -915,24 +1122,27 @@ class RajatAlphaAnalyzer:
         - Pattern hit: explosive pattern detected (passed as parameter)
         """
         pullback_days = self.config.get('strategy_params', 'pullback_days')
-        curr = df.iloc[-1]
+        touch_threshold_pct = self.config.get('strategy_params', 'ma_touch_threshold_pct')
+        # Column arrays instead of per-row iloc Series
+        close = df['close'].to_numpy()
+        ema21 = df['EMA21'].to_numpy()
+        sma50 = df['SMA50'].to_numpy()
         
         # Near MA check
-        dist_ema21 = abs(curr['close'] - curr['EMA21']) / curr['EMA21'] if curr['EMA21'] > 0 else 1.0
-        dist_sma50 = abs(curr['close'] - curr['SMA50']) / curr['SMA50'] if curr['SMA50'] > 0 else 1.0
-        near_ma = (dist_ema21 <= self.config.get('strategy_params', 'ma_touch_threshold_pct')) or (dist_sma50 <= self.config.get('strategy_params', 'ma_touch_threshold_pct'))
+        dist_ema21 = abs(close[-1] - ema21[-1]) / ema21[-1] if ema21[-1] > 0 else 1.0
+        dist_sma50 = abs(close[-1] - sma50[-1]) / sma50[-1] if sma50[-1] > 0 else 1.0
+        near_ma = (dist_ema21 <= touch_threshold_pct) or (dist_sma50 <= touch_threshold_pct)
         
         # Pullback check
         if len(df) < pullback_days + 1:
             return False
         
-        recent_high = df['high'].iloc[-(pullback_days+1):-1].max()
-        is_pullback = recent_high > curr['high']
+        high = df['high']
+        recent_high = high.iloc[-(pullback_days+1):-1].max()
+        is_pullback = recent_high > high.iloc[-1]
         
         # Downtrend count: bars where close < EMA21 in last 4 bars
-        downtrend_window = min(4, len(df))
-        downtrend_count = sum(1 for i in range(-downtrend_window, 0) 
-                             if df.iloc[i]['close'] < df.iloc[i]['EMA21'])
+        downtrend_count = np.count_nonzero(close[-4:] < ema21[-4:])
         
         # Require at least 2 downtrend bars for confirmation
         downtrend_confirmed = downtrend_count >= 2
@@ -955,10 +1165,15 @@ class RajatAlphaAnalyzer:
         if len(df) < stalling_days_long:
             return False  # Not enough data, assume no stalling
         
+        # Both windows are tails of the same arrays; max/min taken once each
+        # (nanmax/nanmin skip missing bars like the pandas reductions did)
+        high = df['high'].to_numpy()
+        low = df['low'].to_numpy()
+        
         # Long-term check
-        window_long = df.iloc[-stalling_days_long:]
-        range_long = window_long['high'].max() - window_long['low'].min()
-        avg_price_long = (window_long['high'].max() + window_long['low'].min()) / 2
+        high_long, low_long = np.nanmax(high[-stalling_days_long:]), np.nanmin(low[-stalling_days_long:])
+        range_long = high_long - low_long
+        avg_price_long = (high_long + low_long) / 2
         
         if avg_price_long == 0:
             return False
@@ -967,9 +1182,9 @@ class RajatAlphaAnalyzer:
         is_stalling_long = range_pct_long <= stalling_range_pct
         
         # Short-term check
-        window_short = df.iloc[-stalling_days_short:]
-        range_short = window_short['high'].max() - window_short['low'].min()
-        avg_price_short = (window_short['high'].max() + window_short['low'].min()) / 2
+        high_short, low_short = np.nanmax(high[-stalling_days_short:]), np.nanmin(low[-stalling_days_short:])
+        range_short = high_short - low_short
+        avg_price_short = (high_short + low_short) / 2
         
         if avg_price_short == 0:
             return False
@@ -1289,26 +1504,56 @@ class PositionManager:
         self.config = config
         self.db = db
         self.data_fetcher = data_fetcher
+        self._sl_tiers = self._build_stop_loss_tiers()
+    
+    def refresh_settings(self):
+        """Rebuild config-derived caches after the configuration is reloaded"""
+        self._sl_tiers = self._build_stop_loss_tiers()
     
-    def calculate_position_size(self, symbol: str, current_price: float) -> Tuple[int, float]:
+    def _build_stop_loss_tiers(self) -> List[Tuple[float, float]]:
         """
-        Simple position sizing: 3% per trade, max 6% per stock, configurable, with cash check.
+        Precompute trailing stop loss tiers as (profit_threshold, sl_multiplier)
+        sorted by threshold descending. sl_multiplier is applied to entry price.
         """
-        # Get account equity
+        initial_sl = self.config.get('risk_management', 'initial_stop_loss_pct')
+        tiers = [(float('-inf'), 1 - initial_sl)]
+        for tier in (1, 2):
+            profit = self.config.get('risk_management', f'tier_{tier}_profit_pct')
+            sl_pct = self.config.get('risk_management', f'tier_{tier}_stop_loss_pct')
+            if profit is not None and sl_pct is not None:
+                tiers.append((profit, 1 - sl_pct))
+        tiers.sort(reverse=True)
+        return tiers
+    
+    def get_account_equity(self) -> Optional[float]:
+        """Current account equity from the broker, or None if the request fails"""
         try:
             account = self.trading_client.get_account()
-            equity = float(account.equity)
+            return float(account.equity)
         except Exception as e:
             logger.error(f"Failed to get account equity: {e}")
-            return 0, 0.0
+            return None
+    
+    def calculate_position_size(self, symbol: str, current_price: float,
+                                equity: Optional[float] = None) -> Tuple[int, float]:
+        """
+        Simple position sizing: 3% per trade, max 6% per stock, configurable, with cash check.
+        
+        equity: account equity already fetched by the caller (e.g. once per
+        execution batch); fetched from the broker when not given.
+        """
+        # Get account equity
+        if equity is None:
+            equity = self.get_account_equity()
+            if equity is None:
+                return 0, 0.0
 
         # Configurable: 3% per trade, 6% max per stock
         trade_pct = self.config.get('trading_rules', 'per_trade_pct', 0.03)  # Each trade: configurable % of equity
         max_allocation_per_stock_pct = self.config.get('trading_rules', 'max_allocation_per_stock_pct', 0.06)  # Max 6% per stock (configurable)
 
         # Calculate current allocation for this stock
-        open_positions = self.db.get_open_positions(symbol=symbol)
-        current_allocation = sum(pos['entry_price'] * pos['remaining_qty'] for pos in open_positions)
+        current_allocation = self.db.get_utilization_usd(symbol=symbol)
         current_allocation_pct = current_allocation / equity if equity > 0 else 0
 
         # Remaining allocation for this stock
@@ -1324,7 +1569,7 @@ class PositionManager:
         trade_amount = equity * effective_trade_pct
 
         # Check overall utilization limit
-        total_current_allocation = sum(pos['entry_price'] * pos['remaining_qty'] for pos in self.db.get_open_positions())
+        total_current_allocation = self.db.get_utilization_usd()
         projected_utilization_pct = (total_current_allocation + trade_amount) / equity
         max_utilization_pct = self.config.get('trading_rules', 'max_equity_utilization_pct', 0.90)
 
@@ -1346,7 +1591,7 @@ class PositionManager:
         logger.info(f"[{symbol}] Simple sizing: {shares} shares @ ${current_price:.2f} = ${actual_amount:.2f} ({effective_trade_pct*100:.1f}% of equity, stock total: {(current_allocation_pct + (actual_amount / equity))*100:.1f}%)")
         return shares, actual_amount
     
-    def execute_buy(self, symbol: str, signal_details: Dict) -> bool:
+    def execute_buy(self, symbol: str, signal_details: Dict, equity: Optional[float] = None) -> bool:
         """
         Execute buy order and record in database
         """
@@ -1354,18 +1599,20 @@ class PositionManager:
         score = signal_details['score']
         
         # Calculate position size
-        shares, trade_amount = self.calculate_position_size(symbol, current_price)
+        shares, trade_amount = self.calculate_position_size(symbol, current_price, equity)
         
         if shares <= 0:
-            logger.warning(f"[{symbol}] Position size too small (0 shares), skipping")
+            logger.warning("[%s] Position size too small (0 shares), skipping", symbol)
             return False
         
         # Calculate initial stop loss
         initial_sl_pct = self.config.get('risk_management', 'initial_stop_loss_pct')
         stop_loss = current_price * (1 - initial_sl_pct)
         
-        logger.info(f"[{symbol}] Executing BUY: {shares} shares @ ${current_price:.2f} (Total: ${trade_amount:.2f})")
-        logger.info(f"[{symbol}] Initial Stop Loss: ${stop_loss:.2f} ({initial_sl_pct*100:.1f}% below entry)")
+        logger.info("[%s] Executing BUY: %d shares @ $%.2f (Total: $%.2f)",
+                    symbol, shares, current_price, trade_amount)
+        logger.info("[%s] Initial Stop Loss: $%.2f (%.1f%% below entry)",
+                    symbol, stop_loss, initial_sl_pct * 100)
         
         try:
             # Submit market order
@@ -1377,7 +1624,7 @@ class PositionManager:
             )
             order = self.trading_client.submit_order(order_request)
             
-            logger.info(f"[{symbol}] Order submitted successfully (ID: {order.id})", extra={'symbol': symbol, 'order_id': order.id})
+            logger.info("[%s] Order submitted successfully (ID: %s)", symbol, order.id, extra={'symbol': symbol, 'order_id': order.id})
             
             # Extract pattern/signal type from signal details
             pattern_type = signal_details.get('pattern', 'Unknown')
@@ -1392,11 +1639,12 @@ class PositionManager:
                 pattern=pattern_type
             )
             
-            logger.info(f"[{symbol}] Position recorded in database (Position ID: {position_id}, Pattern: {pattern_type})", extra={'symbol': symbol, 'order_id': order.id, 'position_id': position_id})
+            logger.info("[%s] Position recorded in database (Position ID: %s, Pattern: %s)",
+                        symbol, position_id, pattern_type, extra={'symbol': symbol, 'order_id': order.id, 'position_id': position_id})
             return True
             
         except Exception as e:
-            logger.error(f"[{symbol}] Order execution failed: {e}")
+            logger.error("[%s] Order execution failed: %s", symbol, e)
             return False
     
     def update_trailing_stop_loss(self, position: Dict, current_price: float):
@@ -1411,20 +1659,12 @@ class PositionManager:
         profit_pct = (current_price - entry_price) / entry_price
         
         # Determine what SL should be based on profit tier
-        tier1_profit = self.config.get('risk_management', 'tier_1_profit_pct')
-        tier2_profit = self.config.get('risk_management', 'tier_2_profit_pct')
-        tier1_sl = self.config.get('risk_management', 'tier_1_stop_loss_pct')
-        tier2_sl = self.config.get('risk_management', 'tier_2_stop_loss_pct')
-        initial_sl = self.config.get('risk_management', 'initial_stop_loss_pct')
-        
-        if profit_pct >= tier2_profit:  # >= 10% profit
-            new_sl_pct = tier2_sl  # 1% below entry (near breakeven)
-        elif profit_pct >= tier1_profit:  # >= 5% profit
-            new_sl_pct = tier1_sl  # 9% below entry
-        else:
-            new_sl_pct = initial_sl  # 17% below entry
+        # (>= 10% profit: 1% below entry, >= 5%: 9% below, else 17% below)
+        for profit_threshold, sl_multiplier in self._sl_tiers:
+            if profit_pct >= profit_threshold:
+                break
         
-        new_sl = entry_price * (1 - new_sl_pct)
+        new_sl = entry_price * sl_multiplier
         
         # Only update if new SL is higher (trailing up)
         if new_sl > current_sl:
@@ -1460,12 +1700,7 @@ class PositionManager:
             
             if current_price >= target_price:
                 # Check if we've already taken this target
-                cursor = self.db.conn.cursor()
-                cursor.execute('''
-                    SELECT COUNT(*) FROM partial_exits 
-                    WHERE position_id = ? AND profit_target = ?
-                ''', (position['id'], target_name))
-                already_taken = cursor.fetchone()[0] > 0
+                already_taken = self.db.has_partial_exit(position['id'], target_name)
                 
                 if not already_taken and remaining_qty > 0:
                     # FIX: Calculate 33% of ORIGINAL quantity, not remaining quantity
@@ -1484,20 +1719,29 @@ class PositionManager:
         return exits_to_execute
     
     def execute_partial_exit(self, position: Dict, target_name: str, 
-                            quantity: int, current_price: float):
-        """Execute partial exit order"""
+                            quantity: int, current_price: float,
+                            profit_pct: Optional[float] = None) -> int:
+        """
+        Execute partial exit order
+        profit_pct: P/L % at current_price as already computed by the caller
+        
+        On success position['remaining_qty'] is decremented in place to mirror
+        the database. Returns the position's remaining quantity.
+        """
         symbol = position['symbol']
         
         # CRITICAL SAFEGUARD: Check if we have enough shares to sell
         if quantity > position['remaining_qty']:
-            logger.error(f"[{symbol}] Cannot execute partial exit - trying to sell {quantity} shares but only {position['remaining_qty']} remaining")
-            return
+            logger.error("[%s] Cannot execute partial exit - trying to sell %d shares but only %d remaining",
+                         symbol, quantity, position['remaining_qty'])
+            return position['remaining_qty']
         
         if quantity <= 0:
-            logger.warning(f"[{symbol}] Cannot execute partial exit - invalid quantity {quantity}")
-            return
+            logger.warning("[%s] Cannot execute partial exit - invalid quantity %d", symbol, quantity)
+            return position['remaining_qty']
         
-        logger.info(f"[{symbol}] Executing Partial Exit {target_name}: {quantity} shares @ ${current_price:.2f}")
+        logger.info("[%s] Executing Partial Exit %s: %d shares @ $%.2f",
+                    symbol, target_name, quantity, current_price)
         
         try:
             order_request = MarketOrderRequest(
@@ -1509,7 +1753,8 @@ class PositionManager:
             order = self.trading_client.submit_order(order_request)
             
             # Record partial exit
-            profit_pct = (current_price - position['entry_price']) / position['entry_price'] * 100
+            if profit_pct is None:
+                profit_pct = (current_price - position['entry_price']) / position['entry_price'] * 100
             self.db.add_partial_exit(
                 position_id=position['id'],
                 quantity=quantity,
@@ -1517,23 +1762,32 @@ class PositionManager:
                 profit_target=target_name,
                 profit_pct=profit_pct
             )
+            position['remaining_qty'] -= quantity
             
-            logger.info(f"[{symbol}] {target_name} executed successfully (+{profit_pct:.2f}%)")
+            logger.info("[%s] %s executed successfully (+%.2f%%)", symbol, target_name, profit_pct)
             
         except Exception as e:
-            logger.error(f"[{symbol}] Partial exit failed: {e}")
+            logger.error("[%s] Partial exit failed: %s", symbol, e)
+        
+        return position['remaining_qty']
     
-    def execute_full_exit(self, position: Dict, current_price: float, reason: str):
-        """Execute full position exit (FIFO)"""
+    def execute_full_exit(self, position: Dict, current_price: float, reason: str,
+                          profit_pct: Optional[float] = None):
+        """
+        Execute full position exit (FIFO)
+        profit_pct: P/L % at current_price as already computed by the caller
+        """
         symbol = position['symbol']
         remaining_qty = position['remaining_qty']
         
         # CRITICAL SAFEGUARD: Check if position still has shares to sell
         if remaining_qty <= 0:
-            logger.warning(f"[{symbol}] Cannot execute full exit - position already fully exited (remaining_qty={remaining_qty})")
+            logger.warning("[%s] Cannot execute full exit - position already fully exited (remaining_qty=%d)",
+                           symbol, remaining_qty)
             return
         
-        logger.info(f"[{symbol}] Executing FULL EXIT: {remaining_qty} shares @ ${current_price:.2f} (Reason: {reason})")
+        logger.info("[%s] Executing FULL EXIT: %d shares @ $%.2f (Reason: %s)",
+                    symbol, remaining_qty, current_price, reason)
         
         try:
             order_request = MarketOrderRequest(
@@ -1551,11 +1805,12 @@ class PositionManager:
                 exit_reason=reason
             )
             
-            profit_pct = (current_price - position['entry_price']) / position['entry_price'] * 100
-            logger.info(f"[{symbol}] Position CLOSED (P/L: {profit_pct:+.2f}%)", extra={'symbol': symbol, 'pnl': profit_pct, 'exit_reason': reason})
+            if profit_pct is None:
+                profit_pct = (current_price - position['entry_price']) / position['entry_price'] * 100
+            logger.info("[%s] Position CLOSED (P/L: %+.2f%%)", symbol, profit_pct, extra={'symbol': symbol, 'pnl': profit_pct, 'exit_reason': reason})
             
         except Exception as e:
-            logger.error(f"[{symbol}] Full exit failed: {e}")
+            logger.error("[%s] Full exit failed: %s", symbol, e)
     
     def check_stop_loss(self, position: Dict, current_price: float) -> bool:
         """
@@ -1574,17 +1829,23 @@ class PositionManager:
             return current_price <= stop_loss
         else:
             return current_price <= stop_loss
-    
-    def check_time_exit(self, position: Dict) -> bool:
-        """Check if Time Exit Signal (TES) triggered"""
-        max_hold_days = self.config.get('risk_management', 'max_hold_days')
-        days_held = self.db.get_days_held(position['id'])
-        return days_held >= max_hold_days
+
 
 # ================================================================================
 # SIGNAL QUEUE (Smart Execution with Waiting Period)
 # ================================================================================
 
+@dataclass
+class QueuedSignal:
+    """Queue entry for a detected signal (slotted record, no per-entry dict)"""
+    __slots__ = ('details', 'first_seen', 'last_validated', 'revalidation_count')
+
+    details: Dict
+    first_seen: datetime
+    last_validated: datetime
+    revalidation_count: int
+
+
 class SignalQueue:
     """
     Manages detected signals during monitoring period with re-validation
@@ -1592,32 +1853,35 @@ class SignalQueue:
     """
 
     def __init__(self, monitoring_minutes: int = 1, top_n: int = 5):
-        self.signals = {}  # {symbol: {signal_details, first_seen, last_validated, revalidation_count}}
+        self.signals: Dict[str, QueuedSignal] = {}
         self.monitoring_minutes = monitoring_minutes
         self.top_n = top_n
         self.window_start_time = None
 
-    def add_signal(self, symbol: str, signal_details: Dict):
-        """Add or update signal in queue with timestamp tracking"""
+    def add_signal(self, symbol: str, signal_details: Dict) -> bool:
+        """Add or update signal in queue with timestamp tracking; True if newly queued"""
         now = datetime.now()
 
         if self.window_start_time is None:
             self.window_start_time = now
 
-        if symbol not in self.signals:
-            self.signals[symbol] = {
-                'details': signal_details,
-                'first_seen': now,
-                'last_validated': now,
-                'revalidation_count': 1
-            }
+        queued = self.signals.get(symbol)
+        if queued is None:
+            self.signals[symbol] = QueuedSignal(
+                details=signal_details,
+                first_seen=now,
+                last_validated=now,
+                revalidation_count=1
+            )
             logger.info(f"[{symbol}] Added to signal queue (Score: {signal_details['score']:.1f})")
+            return True
         else:
             # Update existing signal with fresh details
-            self.signals[symbol]['last_validated'] = now
-            self.signals[symbol]['revalidation_count'] += 1
-            self.signals[symbol]['details'] = signal_details  # Update with latest
-            logger.info(f"[{symbol}] Signal updated in queue ({self.signals[symbol]['revalidation_count']} validations)")
+            queued.last_validated = now
+            queued.revalidation_count += 1
+            queued.details = signal_details  # Update with latest
+            logger.info(f"[{symbol}] Signal updated in queue ({queued.revalidation_count} validations)")
+            return False
 
     def is_window_complete(self) -> bool:
         """Check if 15-minute monitoring window is complete"""
@@ -1633,29 +1897,42 @@ class SignalQueue:
         Returns: [(symbol, signal_details), ...] sorted by score descending with tie-breaking
         """
         validated_signals = []
+        # Daily bars fetched during re-validation, reused by tie-breaking
+        bar_cache: Dict[str, pd.DataFrame] = {}
 
-        for symbol, signal_data in self.signals.items():
+        # Fetch fresh bars for all queued symbols concurrently; re-validation then
+        # runs serially against the warm cache (the analyzer keeps touch state)
+        analyzer.data_fetcher.prefetch_daily_bars(list(self.signals), days=365)
+
+        for symbol, queued in self.signals.items():
             # CRITICAL: Re-validate signal before execution
             signal_valid, signal_details = analyzer.analyze_entry_signal(symbol)
 
             if signal_valid:
                 # Signal still valid after monitoring period
-                signal_details['persistence_score'] = signal_data['revalidation_count']
+                signal_details['persistence_score'] = queued.revalidation_count
                 validated_signals.append((symbol, signal_details))
-                logger.info(f"[{symbol}] ✅ Signal STILL VALID after {self.monitoring_minutes}min monitoring (Score: {signal_details['score']:.1f}, Validations: {signal_data['revalidation_count']})")
+                # Served from the fetcher cache populated by analyze_entry_signal
+                bar_cache[symbol] = analyzer.data_fetcher.get_daily_bars(symbol, days=365)
+                logger.info(f"[{symbol}] ✅ Signal STILL VALID after {self.monitoring_minutes}min monitoring (Score: {signal_details['score']:.1f}, Validations: {queued.revalidation_count})")
             else:
                 logger.warning(f"[{symbol}] ❌ Signal EXPIRED during monitoring - {signal_details['reason']}")
 
-        # Sort by score descending with tie-breaking preferences
-        validated_signals = self._sort_with_tie_breaking(validated_signals, analyzer)
-
-        # Return top N
-        return validated_signals[:self.top_n]
+        # Select top N by score descending with tie-breaking preferences
+        return self._sort_with_tie_breaking(validated_signals, analyzer, bar_cache, limit=self.top_n)
 
-    def _sort_with_tie_breaking(self, signals: List[Tuple[str, Dict]], analyzer) -> List[Tuple[str, Dict]]:
+    def _sort_with_tie_breaking(self, signals: List[Tuple[str, Dict]], analyzer,
+                                bar_cache: Optional[Dict[str, pd.DataFrame]] = None,
+                                limit: Optional[int] = None) -> List[Tuple[str, Dict]]:
         """
         Sort signals by score descending, with tie-breaking preferences when scores are equal
 
+        bar_cache: optional {symbol: daily bars} collected during re-validation.
+        When present, bars and the re-validated current price are reused instead
+        of being fetched again per symbol.
+        limit: if given, only the best `limit` signals are selected (heap-based,
+        same order as a full sort truncated to `limit`).
+
         Tie-breaking preferences (in order of priority):
         1. Stock is green today (price > yesterday's close)
         2. First 21EMA touch with bullish patterns (engulfing, tweezer, piercing)
@@ -1669,11 +1946,16 @@ class SignalQueue:
 
             try:
                 # Get current market data for tie-breaking evaluation
-                df_daily = analyzer.data_fetcher.get_daily_bars(symbol, days=30)
+                if bar_cache is not None and symbol in bar_cache:
+                    df_daily = bar_cache[symbol]
+                else:
+                    df_daily = analyzer.data_fetcher.get_daily_bars(symbol, days=30)
                 if df_daily is None or len(df_daily) < 2:
                     return (signal_details['score'], priority_score)
 
-                current_price = analyzer.data_fetcher.get_current_price(symbol)
+                current_price = signal_details.get('current_price')
+                if current_price is None:
+                    current_price = analyzer.data_fetcher.get_current_price(symbol)
                 if current_price is None:
                     return (signal_details['score'], priority_score)
 
@@ -1730,7 +2012,10 @@ class SignalQueue:
             return (signal_details['score'], priority_score)
 
         # Sort by score descending, then by tie-breaking priority descending
-        signals.sort(key=get_tie_breaking_priority, reverse=True)
+        if limit is None:
+            signals.sort(key=get_tie_breaking_priority, reverse=True)
+        else:
+            signals = heapq.nlargest(limit, signals, key=get_tie_breaking_priority)
 
         # Log the final ranking
         logger.info("Signal ranking with tie-breaking applied:")
@@ -1793,35 +2078,104 @@ class RajatAlphaTradingBot:
         )
         self.last_execution_time = None  # Track when we last executed signals
         
+        self._eastern_tz = pytz.timezone('US/Eastern')
+        
+        # Background worker used to overlap buy-side bar fetching with the sell guardian
+        self._background = ThreadPoolExecutor(max_workers=1)
+        self._pending_prefetch = None  # Last Future submitted to _background
+        
+        # Parsed watchlist/exclusion/sell list files: {(path, skip_comments): (mtime, symbols)}
+        self._symbol_file_cache = {}
+        
+        # Snapshot of trading rules read in the scan loops
+        self._load_runtime_settings()
+        
         logger.info("=" * 80)
         logger.info("RAJAT ALPHA V67 TRADING BOT INITIALIZED")
         logger.info(f"Mode: {'PAPER TRADING' if self.is_paper else 'LIVE TRADING'}")
         logger.info("=" * 80)
     
+    def _load_runtime_settings(self):
+        """
+        Snapshot trading-rule config values used in the per-symbol scan loops
+        These don't change within a scan; call reload_config() to pick up edits
+        """
+        rules = 'trading_rules'
+        self.max_open_positions = int(self.config.get(rules, 'max_open_positions'))
+        self.max_trades_per_day = int(self.config.get(rules, 'max_trades_per_day'))
+        self.max_trades_per_stock = int(self.config.get(rules, 'max_trades_per_stock', 1))
+        self.prevent_same_day_reentry = bool(self.config.get(rules, 'prevent_same_day_reentry'))
+        # Signal types (as reported in signal_details['signal_types']) allowed to queue
+        self.enabled_signal_types = frozenset(
+            signal_type for signal_type, key in (('swing', 'enable_swing_signals'),
+                                                 ('21Touch', 'enable_21touch_signals'),
+                                                 ('50Touch', 'enable_50touch_signals'))
+            if self.config.get(rules, key, True)
+        )
+        self.scan_max_workers = int(self.config.get('execution_schedule', 'scan_max_workers', 16))
+        # Symbols fetched per prefetch chunk ahead of the buy-hunter analysis loop
+        self.scan_prefetch_chunk = self.scan_max_workers * 2
+        # Stop collecting once the queue holds this many signals per open slot
+        # (margin for signals that fail re-validation)
+        self.signal_oversample_factor = int(self.config.get('execution_schedule', 'signal_oversample_factor', 3))
+        
+        # Buy window parsed once from "HH:MM" (validated by ConfigManager)
+        buy_window_start = self.config.get('execution_schedule', 'buy_window_start_time')
+        buy_window_end = self.config.get('execution_schedule', 'buy_window_end_time')
+        self._buy_start_h, self._buy_start_m = map(int, buy_window_start.split(':'))
+        self._buy_end_h, self._buy_end_m = map(int, buy_window_end.split(':'))
+    
+    def reload_config(self):
+        """Re-read the configuration file and refresh the runtime settings snapshot"""
+        self.config.config = self.config.load_config()
+        self.config.validate_config()
+        self._load_runtime_settings()
+        self.position_manager.refresh_settings()
+        logger.info("Configuration reloaded")
+    
+    def _load_symbol_file(self, path: str, skip_comments: bool = False) -> List[str]:
+        """
+        Parse a one-symbol-per-line file, re-reading it only when its mtime changes
+        Raises FileNotFoundError if the file does not exist
+        """
+        mtime = os.stat(path).st_mtime
+        cache_key = (path, skip_comments)
+        cached = self._symbol_file_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        with open(path, 'r') as f:
+            lines = [line.strip() for line in f]
+        symbols = [line.upper() for line in lines
+                   if line and not (skip_comments and line.startswith('#'))]
+        self._symbol_file_cache[cache_key] = (mtime, symbols)
+        return symbols
+    
     def get_watchlist(self) -> List[str]:
         """Load watchlist from file and apply exclusions"""
         watchlist_file = self.config.get('trading_rules', 'watchlist_file')
         try:
-            with open(watchlist_file, 'r') as f:
-                symbols = [line.strip().upper() for line in f if line.strip()]
+            symbols = list(self._load_symbol_file(watchlist_file))
             logger.info(f"Watchlist loaded: {len(symbols)} symbols")
             
             # Apply exclusion list
             exclusion_file = self.config.get('trading_rules', 'exclusion_file')
             if exclusion_file:
                 try:
-                    with open(exclusion_file, 'r') as f:
-                        exclusions = set(line.strip().upper() for line in f if line.strip())
+                    exclusions = frozenset(self._load_symbol_file(exclusion_file, skip_comments=True))
                     
                     if exclusions:
-                        original_count = len(symbols)
-                        symbols = [s for s in symbols if s not in exclusions]
-                        excluded_count = original_count - len(symbols)
+                        # Single pass: split the watchlist into kept and excluded symbols
+                        is_excluded = exclusions.__contains__
+                        kept_symbols, excluded_symbols = [], []
+                        for s in symbols:
+                            (excluded_symbols if is_excluded(s) else kept_symbols).append(s)
+                        symbols = kept_symbols
+                        excluded_count = len(excluded_symbols)
                         
                         if excluded_count > 0:
-                            if self.config.get('trading_rules', 'log_excluded_symbols'):
-                                excluded_symbols = [s for s in symbols if s in exclusions]
-                                logger.info(f"Excluded {excluded_count} symbols: {', '.join(list(exclusions)[:10])}{'...' if len(exclusions) > 10 else ''}")
+                            if self.config.get('trading_rules', 'log_excluded_symbols') and logger.isEnabledFor(logging.INFO):
+                                logger.info(f"Excluded {excluded_count} symbols: {', '.join(excluded_symbols[:10])}{'...' if excluded_count > 10 else ''}")
                             else:
                                 logger.info(f"Excluded {excluded_count} symbols from watchlist")
                 except FileNotFoundError:
@@ -1835,8 +2189,16 @@ class RajatAlphaTradingBot:
             logger.error(f"Watchlist file {watchlist_file} not found!")
             return []
     
-    def get_sell_watchlist(self) -> Optional[List[str]]:
-        """Load sell watchlist from file - if empty/missing, monitor all positions"""
+    def get_scan_watchlist(self) -> List[str]:
+        """Symbols the buy hunter scans, according to trading_rules.portfolio_mode"""
+        portfolio_mode = self.config.get('trading_rules', 'portfolio_mode')
+
+        if portfolio_mode == 'specific_stocks':
+            return self.config.get('trading_rules', 'specific_stocks')
+        return self.get_watchlist()
+    
+    def get_sell_watchlist(self) -> Optional[FrozenSet[str]]:
+        """Load sell watchlist from file as a set - if empty/missing, monitor all positions"""
         sell_watchlist_file = self.config.get('trading_rules', 'sell_watchlist_file')
         
         if not sell_watchlist_file:
@@ -1844,14 +2206,14 @@ class RajatAlphaTradingBot:
             return None
             
         try:
-            with open(sell_watchlist_file, 'r') as f:
-                symbols = [line.strip().upper() for line in f if line.strip() and not line.strip().startswith('#')]
+            symbols = frozenset(self._load_symbol_file(sell_watchlist_file, skip_comments=True))
             
             if not symbols:
                 logger.debug("Sell watchlist empty, monitoring all positions")
                 return None
                 
-            logger.debug(f"Sell watchlist loaded: {len(symbols)} symbols - {', '.join(symbols)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Sell watchlist loaded: {len(symbols)} symbols - {', '.join(sorted(symbols))}")
             return symbols
             
         except FileNotFoundError:
@@ -1861,9 +2223,10 @@ class RajatAlphaTradingBot:
             logger.warning(f"Error loading sell watchlist: {e}, monitoring all positions")
             return None
     
-    def is_market_open(self) -> bool:
-        """Check if market is currently open"""
-        now = datetime.now(pytz.timezone('US/Eastern'))
+    def is_market_open(self, now: Optional[datetime] = None) -> bool:
+        """Check if market is open at `now` (Eastern time, defaults to the current time)"""
+        if now is None:
+            now = datetime.now(self._eastern_tz)
         
         # Weekend check
         if now.weekday() > 4:
@@ -1875,18 +2238,29 @@ class RajatAlphaTradingBot:
         
         return market_start <= now <= market_end
     
-    def is_buy_window(self) -> bool:
-        now = datetime.now(pytz.timezone('US/Eastern'))
-        
-        # Use direct start/end times from config (hour-based)
-        buy_window_start = self.config.get('execution_schedule', 'buy_window_start_time')
-        buy_window_end = self.config.get('execution_schedule', 'buy_window_end_time')
-        
-        start_h, start_m = map(int, buy_window_start.split(':'))
-        end_h, end_m = map(int, buy_window_end.split(':'))
+    def _seconds_until_next_market_open(self, now: Optional[datetime] = None) -> float:
+        """Seconds until the next weekday 9:30 AM Eastern (holidays not considered)"""
+        if now is None:
+            now = datetime.now(self._eastern_tz)
+        
+        open_date = now.date()
+        if (now.hour, now.minute) >= (9, 30):
+            open_date += timedelta(days=1)
+        while open_date.weekday() > 4:
+            open_date += timedelta(days=1)
+        
+        next_open = self._eastern_tz.localize(
+            datetime(open_date.year, open_date.month, open_date.day, 9, 30)
+        )
+        return max(0.0, (next_open - now).total_seconds())
+    
+    def is_buy_window(self, now: Optional[datetime] = None) -> bool:
+        if now is None:
+            now = datetime.now(self._eastern_tz)
         
-        start_time = now.replace(hour=start_h, minute=start_m, second=0)
-        end_time = now.replace(hour=end_h, minute=end_m, second=0)
+        # Use direct start/end times from config (parsed once in _load_runtime_settings)
+        start_time = now.replace(hour=self._buy_start_h, minute=self._buy_start_m, second=0)
+        end_time = now.replace(hour=self._buy_end_h, minute=self._buy_end_m, second=0)
         
         in_window = start_time <= now <= end_time
         
@@ -1895,9 +2269,9 @@ class RajatAlphaTradingBot:
         
         return in_window
     
-    def get_scan_interval(self) -> int:
+    def get_scan_interval(self, now: Optional[datetime] = None) -> int:
         """Get scan interval based on time of day"""
-        if self.is_buy_window():
+        if self.is_buy_window(now):
             # Last hour: scan every 1 minute
             return self.config.get('execution_schedule', 'last_hour_interval_seconds')
         else:
@@ -1920,46 +2294,58 @@ class RajatAlphaTradingBot:
         # Get sell watchlist filter (optional)
         sell_watchlist = self.get_sell_watchlist()
         
-        # Filter positions if sell watchlist is provided
+        # Filter positions if sell watchlist is provided (set membership, O(1) per position)
         if sell_watchlist is not None:
             filtered_positions = [p for p in open_positions if p['symbol'] in sell_watchlist]
             skipped_count = len(open_positions) - len(filtered_positions)
             
-            if skipped_count > 0:
+            if skipped_count > 0 and logger.isEnabledFor(logging.INFO):
                 skipped_symbols = [p['symbol'] for p in open_positions if p['symbol'] not in sell_watchlist]
                 logger.info(f"Sell filtering: Monitoring {len(filtered_positions)} positions, skipping {skipped_count} positions ({', '.join(skipped_symbols[:3])}{'...' if len(skipped_symbols) > 3 else ''})")
             
             positions_to_monitor = filtered_positions
         else:
             positions_to_monitor = open_positions
-            logger.debug(f"Monitoring all {len(positions_to_monitor)} positions (no sell filter)")
+            logger.debug("Monitoring all %d positions (no sell filter)", len(positions_to_monitor))
         
         if not positions_to_monitor:
             logger.info("No positions match sell watchlist criteria")
             return
         
+        # Get current prices for this tick (single multi-symbol request)
+        monitored_symbols = sorted({p['symbol'] for p in positions_to_monitor})
+        prices = self.data_fetcher.get_current_prices(monitored_symbols)
+        for symbol in monitored_symbols:
+            if symbol not in prices:
+                logger.warning("[%s] Could not fetch current price, skipping", symbol)
+        
+        # Stop loss / TES detection for all positions in one query
+        max_hold_days = self.config.get('risk_management', 'max_hold_days')
+        exit_triggers = self.db.get_exit_triggers(prices, max_hold_days)
+        
         for position in positions_to_monitor:
             symbol = position['symbol']
             
-            # Get current price
-            current_price = self.data_fetcher.get_current_price(symbol)
+            current_price = prices.get(symbol)
             if current_price is None:
-                logger.warning(f"[{symbol}] Could not fetch current price, skipping")
                 continue
             
             profit_pct = (current_price - position['entry_price']) / position['entry_price'] * 100
-            logger.info(f"[{symbol}] Position ID {position['id']} | P/L: {profit_pct:+.2f}% | Remaining: {position['remaining_qty']} shares")
+            logger.info("[%s] Position ID %s | P/L: %+.2f%% | Remaining: %s shares",
+                        symbol, position['id'], profit_pct, position['remaining_qty'])
+            
+            exit_trigger = exit_triggers.get(position['id'])
             
             # 1. Check Stop Loss (Priority 1 - most important)
-            if self.position_manager.check_stop_loss(position, current_price):
-                logger.warning(f"[{symbol}] STOP LOSS TRIGGERED at ${current_price:.2f}")
-                self.position_manager.execute_full_exit(position, current_price, "Stop Loss")
+            if exit_trigger == 'Stop Loss' and self.position_manager.check_stop_loss(position, current_price):
+                logger.warning("[%s] STOP LOSS TRIGGERED at $%.2f", symbol, current_price)
+                self.position_manager.execute_full_exit(position, current_price, "Stop Loss", profit_pct)
                 continue
             
             # 2. Check Time Exit Signal (TES)
-            if self.position_manager.check_time_exit(position):
-                logger.warning(f"[{symbol}] TIME EXIT SIGNAL (TES) triggered")
-                self.position_manager.execute_full_exit(position, current_price, "TES")
+            if exit_trigger == 'TES':
+                logger.warning("[%s] TIME EXIT SIGNAL (TES) triggered", symbol)
+                self.position_manager.execute_full_exit(position, current_price, "TES", profit_pct)
                 continue
             
             # 3. Update Trailing Stop Loss
@@ -1968,23 +2354,27 @@ class RajatAlphaTradingBot:
             # 4. Check Partial Profit Targets
             partial_exits = self.position_manager.check_partial_exit_targets(position, current_price)
             if partial_exits:
+                remaining_qty = position['remaining_qty']
                 for target_name, quantity, target_price in partial_exits:
-                    self.position_manager.execute_partial_exit(
-                        position, target_name, quantity, current_price
+                    remaining_qty = self.position_manager.execute_partial_exit(
+                        position, target_name, quantity, current_price, profit_pct
                     )
                 
-                # CRITICAL FIX: Reload position after partial exits to get updated remaining_qty
+                # CRITICAL FIX: execute_partial_exit keeps remaining_qty in sync with the DB
                 # This prevents overselling if stop loss or other exits trigger in next iteration
-                refreshed_position = self.db.get_position_by_id(position['id'])
-                if refreshed_position and refreshed_position['remaining_qty'] == 0:
-                    logger.info(f"[{symbol}] Position fully exited via partial exits")
+                if remaining_qty == 0:
+                    logger.info("[%s] Position fully exited via partial exits", symbol)
                     continue
     
-    def run_buy_hunter(self):
+    def run_buy_hunter(self, now: Optional[datetime] = None, watchlist: Optional[List[str]] = None,
+                       prefetch=None):
         """
         BUY HUNTER: Collects signals during 15-minute window, then re-validates and executes top N
+        
+        watchlist is the scan watchlist if the caller already loaded it this iteration,
+        and prefetch the Future fetching its first chunk of bars (see _start_buy_prefetch).
         """
-        if not self.is_buy_window():
+        if not self.is_buy_window(now):
             logger.info("BUY HUNTER: Outside buy window, skipping scan")
             return
 
@@ -2000,69 +2390,114 @@ class RajatAlphaTradingBot:
         queue_status = self.signal_queue.get_queue_status()
         logger.info(f"Signal Queue Status: {queue_status['signals_queued']} signals, {queue_status['minutes_elapsed']:.1f}min elapsed")
 
-        # Check daily trade limit
-        max_trades_per_day = self.config.get('trading_rules', 'max_trades_per_day')
-        trades_today = self.db.count_trades_today()
+        # Check daily trade limit and open position slots
+        max_trades_per_day = self.max_trades_per_day
+        available_slots, trades_today, open_by_symbol = self._get_collection_slots()
 
         if trades_today >= max_trades_per_day:
             logger.info(f"Daily trade limit reached ({trades_today}/{max_trades_per_day}), no new signal collection")
             return
 
-        # Get watchlist
-        portfolio_mode = self.config.get('trading_rules', 'portfolio_mode')
-
-        if portfolio_mode == 'watchlist_only':
-            watchlist = self.get_watchlist()
-        elif portfolio_mode == 'specific_stocks':
-            watchlist = self.config.get('trading_rules', 'specific_stocks')
-        else:
-            watchlist = self.get_watchlist()
+        if available_slots <= 0:
+            logger.info(f"No open position slots available ({sum(open_by_symbol.values())}/{self.max_open_positions}), no new signal collection")
+            return
+        # No point queueing far more new signals per scan than this window can fill
+        collection_cap = available_slots * self.signal_oversample_factor
+
+        # Get watchlist, minus symbols the execution phase would reject anyway
+        if watchlist is None:
+            watchlist = self.get_scan_watchlist()
+        blocked = self._get_blocked_symbols(open_by_symbol)
+        if blocked:
+            watchlist = [s for s in watchlist if s not in blocked]
+            logger.info(f"Skipping {len(blocked)} symbols at per-stock or same-day limits")
+
+        # Bars are fetched one chunk ahead of the analysis loop, so stopping
+        # early at collection_cap also stops requesting bars
+        chunk_size = self.scan_prefetch_chunk
+        if prefetch is None:
+            prefetch = self._prefetch_chunk(watchlist[:chunk_size])
 
         # Collect signals (don't execute yet)
         new_signals_found = 0
+        pending_signal_logs = []  # Written to signal history in one transaction after the scan
 
-        for symbol in watchlist:
+        for i, symbol in enumerate(watchlist):
+            if i % chunk_size == 0:
+                if prefetch is not None:
+                    prefetch.result()
+                prefetch = self._prefetch_chunk(watchlist[i + chunk_size:i + 2 * chunk_size])
             try:
                 signal_valid, signal_details = self.analyzer.analyze_entry_signal(symbol)
 
                 # Log signal to history (whether executed or not)
-                self.db.log_signal(symbol, signal_details, False)
+                pending_signal_logs.append((symbol, signal_details, False))
 
                 if signal_valid:
-                    # Per-stock limit check: don't collect signals beyond configured max positions per stock
-                    max_trades_per_stock = self.config.get('trading_rules', 'max_trades_per_stock')
-                    existing_positions = self.db.get_open_positions(symbol=symbol)
-                    if len(existing_positions) >= max_trades_per_stock:
-                        logger.info(f"[{symbol}] Max positions per stock reached ({len(existing_positions)}/{max_trades_per_stock}), skipping signal collection")
-                        continue
-
                     # Check if at least one of the signal's applicable types is enabled
                     # A signal can qualify for multiple types (e.g. swing+21Touch)
                     # It executes if ANY of its types is enabled
                     signal_types = signal_details.get('signal_types', [signal_details.get('pattern', '')])
-                    enable_21touch = self.config.get('trading_rules', 'enable_21touch_signals', True)
-                    enable_50touch = self.config.get('trading_rules', 'enable_50touch_signals', True)
-                    enable_swing = self.config.get('trading_rules', 'enable_swing_signals', True)
-                    enabled_map = {'swing': enable_swing, '21Touch': enable_21touch, '50Touch': enable_50touch}
-                    if not any(enabled_map.get(st, False) for st in signal_types):
-                        logger.info(f"[{symbol}] Signal filtered out - none of its signal types {signal_types} are enabled")
+                    if self.enabled_signal_types.isdisjoint(signal_types):
+                        logger.info("[%s] Signal filtered out - none of its signal types %s are enabled", symbol, signal_types)
                         continue
                     
                     # Add to queue instead of executing immediately
-                    self.signal_queue.add_signal(symbol, signal_details)
+                    if not self.signal_queue.add_signal(symbol, signal_details):
+                        # Re-detection refreshes the queued entry but doesn't count towards the cap
+                        continue
                     new_signals_found += 1
-                    logger.info(f"[{symbol}] 📊 SIGNAL COLLECTED (Score: {signal_details['score']:.1f}) - Will re-validate in {self.signal_queue.monitoring_minutes} minutes")
+                    logger.info("[%s] 📊 SIGNAL COLLECTED (Score: %.1f) - Will re-validate in %s minutes",
+                                symbol, signal_details['score'], self.signal_queue.monitoring_minutes)
+
+                    if new_signals_found >= collection_cap:
+                        logger.info(f"Collected {new_signals_found} new signals for {available_slots} available slots - stopping scan early")
+                        break
 
             except Exception as e:
-                logger.error(f"[{symbol}] Analysis error: {e}")
+                logger.error("[%s] Analysis error: %s", symbol, e)
                 continue
 
+        # A scan stopped at collection_cap leaves its look-ahead chunk queued
+        if prefetch is not None:
+            prefetch.cancel()
+
+        self.db.log_signals_batch(pending_signal_logs)
+
         if new_signals_found > 0:
             logger.info(f"✅ Collected {new_signals_found} new signals. Total in queue: {len(self.signal_queue.signals)}")
             logger.info(f"⏰ Waiting {self.signal_queue.monitoring_minutes} minutes for re-validation before execution...")
         else:
             logger.info("📊 No new signals found in this scan")
     
+    def _get_collection_slots(self) -> Tuple[int, int, Dict[str, int]]:
+        """
+        Slots a collection scan can fill: (available_slots, trades_today, open_by_symbol)
+        
+        available_slots is the lower of free position slots and trades left today;
+        a scan only runs when it is positive.
+        """
+        trades_today = self.db.count_trades_today()
+        open_by_symbol = self.db.count_open_positions_by_symbol()
+        available_slots = min(self.max_open_positions - sum(open_by_symbol.values()),
+                              self.max_trades_per_day - trades_today)
+        return available_slots, trades_today, open_by_symbol
+    
+    def _get_blocked_symbols(self, open_by_symbol: Optional[Dict[str, int]] = None) -> set:
+        """
+        Symbols that cannot be bought right now
+        
+        Covers symbols at max_trades_per_stock open positions and, when
+        prevent_same_day_reentry is on, symbols already bought today.
+        """
+        if open_by_symbol is None:
+            open_by_symbol = self.db.count_open_positions_by_symbol()
+        blocked = {symbol for symbol, count in open_by_symbol.items()
+                   if count >= self.max_trades_per_stock}
+        if self.prevent_same_day_reentry:
+            blocked |= self.db.get_symbols_traded_today()
+        return blocked
+    
     def _execute_queued_signals(self):
         """
         PRIVATE METHOD: Execute top N re-validated signals from queue
@@ -2080,13 +2515,17 @@ class RajatAlphaTradingBot:
 
         logger.info(f"🎯 Executing {len(signals_to_execute)} re-validated signals (top by score)")
 
+        # Snapshot position state once; kept current locally as trades execute
+        open_by_symbol = self.db.count_open_positions_by_symbol()
+        traded_today = self.db.get_symbols_traded_today()
+
         # Check current position limits
-        open_positions = self.db.get_open_positions()
-        max_positions = self.config.get('trading_rules', 'max_open_positions')
-        available_slots = max_positions - len(open_positions)
+        open_count = sum(open_by_symbol.values())
+        max_positions = self.max_open_positions
+        available_slots = max_positions - open_count
 
         # Check daily limits
-        max_trades_per_day = self.config.get('trading_rules', 'max_trades_per_day')
+        max_trades_per_day = self.max_trades_per_day
         trades_today = self.db.count_trades_today()
         available_daily_slots = max_trades_per_day - trades_today
 
@@ -2094,42 +2533,50 @@ class RajatAlphaTradingBot:
         final_slots = min(available_slots, available_daily_slots, len(signals_to_execute))
 
         if final_slots <= 0:
-            logger.warning(f"No execution slots available (Positions: {len(open_positions)}/{max_positions}, Daily: {trades_today}/{max_trades_per_day})")
+            logger.warning(f"No execution slots available (Positions: {open_count}/{max_positions}, Daily: {trades_today}/{max_trades_per_day})")
             self.signal_queue.reset()
             return
 
         executed_count = 0
-
-        for symbol, signal_details in signals_to_execute[:final_slots]:
+        executed_signal_logs = []
+        # Equity is read once per batch. Trades stay sequential because sizing
+        # checks allocation against positions recorded by the previous buys.
+        equity = self.position_manager.get_account_equity()
+        enable_same_day_protection = self.prevent_same_day_reentry
+        max_trades_per_stock = self.max_trades_per_stock
+
+        for rank, (symbol, signal_details) in enumerate(signals_to_execute[:final_slots], 1):
             score = signal_details['score']
 
             # SAME-DAY PROTECTION CHECK
-            enable_same_day_protection = self.config.get('trading_rules', 'prevent_same_day_reentry')
-            if enable_same_day_protection and self.db.was_traded_today(symbol):
+            if enable_same_day_protection and symbol in traded_today:
                 logger.info(f"[{symbol}] ⚠️ SAME-DAY PROTECTION: Already traded {symbol} today, skipping")
                 continue
 
             # Check daily limit before executing
-            if self.db.count_trades_today() >= max_trades_per_day:
+            if trades_today >= max_trades_per_day:
                 logger.info(f"Daily trade limit reached ({max_trades_per_day}), stopping execution")
                 break
 
             # Check per-stock limit
-            symbol_positions = self.db.get_open_positions(symbol=symbol)
-            max_trades_per_stock = self.config.get('trading_rules', 'max_trades_per_stock')
-            if len(symbol_positions) >= max_trades_per_stock:
-                logger.info(f"[{symbol}] Max trades per stock reached ({len(symbol_positions)}/{max_trades_per_stock}), skipping")
+            symbol_open_count = open_by_symbol.get(symbol, 0)
+            if symbol_open_count >= max_trades_per_stock:
+                logger.info(f"[{symbol}] Max trades per stock reached ({symbol_open_count}/{max_trades_per_stock}), skipping")
                 continue
 
             # Execute the trade
-            success = self.position_manager.execute_buy(symbol, signal_details)
+            success = self.position_manager.execute_buy(symbol, signal_details, equity)
 
             if success:
                 # Log executed signal
-                self.db.log_signal(symbol, signal_details, True)
+                executed_signal_logs.append((symbol, signal_details, True))
                 executed_count += 1
-                logger.info(f"[{symbol}] ✅ RE-VALIDATED SIGNAL EXECUTED (Rank: {signals_to_execute.index((symbol, signal_details)) + 1}, Score: {score:.1f})")
+                trades_today += 1
+                open_by_symbol[symbol] = symbol_open_count + 1
+                traded_today.add(symbol)
+                logger.info(f"[{symbol}] ✅ RE-VALIDATED SIGNAL EXECUTED (Rank: {rank}, Score: {score:.1f})")
 
+        self.db.log_signals_batch(executed_signal_logs)
         logger.info(f"🎯 Execution complete: {executed_count}/{len(signals_to_execute)} signals executed")
 
         # Reset queue for next monitoring window
@@ -2140,34 +2587,105 @@ class RajatAlphaTradingBot:
         """Main execution loop with signal queue management"""
         logger.info("Starting main execution loop...")
         
-        while True:
-            try:
-                if self.is_market_open():
-                    # 1. Always run Sell Guardian (monitors exits)
-                    self.run_sell_guardian()
-                    
-                    # 2. Run Buy Hunter (signal collection or execution)
-                    self.run_buy_hunter()
-                    
-                    # 3. Dynamic sleep interval based on queue status
-                    interval = self._get_dynamic_scan_interval()
-                    logger.info(f"Next scan in {interval} seconds...\n")
-                    time.sleep(interval)
-                    
-                else:
-                    logger.info("Market closed. Sleeping for 5 minutes...")
-                    time.sleep(300)
-                    
-            except KeyboardInterrupt:
-                logger.info("Bot stopped by user (Ctrl+C)")
-                break
-            except Exception as e:
-                logger.error(f"CRITICAL ERROR in main loop: {e}", exc_info=True)
-                logger.info("Sleeping 60 seconds before retry...")
-                time.sleep(60)
+        try:
+            while True:
+                try:
+                    # Eastern-time reading for the market-open and prefetch checks below
+                    now_eastern = datetime.now(self._eastern_tz)
+                    if self.is_market_open(now_eastern):
+                        scan_started = time.monotonic()
+                        
+                        # Start buy-side bar fetching so it overlaps the sell guardian's I/O
+                        watchlist, prefetch = self._start_buy_prefetch(now_eastern)
+                        
+                        # 1. Always run Sell Guardian (monitors exits)
+                        self.run_sell_guardian()
+                        
+                        # 2. Run Buy Hunter (signal collection or execution). The sell
+                        #    guardian can take a while, so window checks use a fresh reading
+                        self.run_buy_hunter(datetime.now(self._eastern_tz), watchlist, prefetch)
+                        
+                        # 3. Dynamic sleep interval based on queue status, measured
+                        #    from scan start so scan time doesn't stretch the cadence
+                        now_eastern = datetime.now(self._eastern_tz)
+                        interval = self._get_dynamic_scan_interval(now_eastern)
+                        sleep_for = self._seconds_until_next_scan(scan_started, interval, now_eastern)
+                        logger.info(f"Next scan in {sleep_for:.0f} seconds (interval {interval}s)...\n")
+                        time.sleep(sleep_for)
+                        
+                    else:
+                        # Sleep in chunks of at most 5 minutes, but wake right at the open
+                        until_open = self._seconds_until_next_market_open(now_eastern)
+                        sleep_for = max(1.0, min(until_open, 300))
+                        logger.info(f"Market closed ({until_open / 60:.0f} min until open). Sleeping for {sleep_for:.0f} seconds...")
+                        time.sleep(sleep_for)
+                        
+                except KeyboardInterrupt:
+                    logger.info("Bot stopped by user (Ctrl+C)")
+                    break
+                except Exception as e:
+                    logger.error(f"CRITICAL ERROR in main loop: {e}", exc_info=True)
+                    logger.info("Sleeping 60 seconds before retry...")
+                    time.sleep(60)
+        finally:
+            # The prefetch worker is non-daemon; don't let queued bar requests delay exit.
+            # Only one chunk is ever outstanding, so cancelling it is enough
+            # (shutdown's cancel_futures needs Python 3.9+)
+            if self._pending_prefetch is not None:
+                self._pending_prefetch.cancel()
+            self._background.shutdown(wait=False)
+    
+    def _start_buy_prefetch(self, now: Optional[datetime] = None):
+        """
+        Start fetching the first chunk of bars for the coming buy-hunter scan
+        
+        Returns (watchlist, Future), or (None, None) when this iteration won't run
+        a collection scan (outside the window, queue ready to execute, or no slots
+        left), so no bar requests are sent. run_buy_hunter fetches the remaining
+        chunks as its scan reaches them.
+        """
+        if not self.is_buy_window(now) or self.signal_queue.is_window_complete():
+            return None, None
+        available_slots, _, open_by_symbol = self._get_collection_slots()
+        if available_slots <= 0:
+            return None, None
+        watchlist = self.get_scan_watchlist()
+        blocked = self._get_blocked_symbols(open_by_symbol)
+        unblocked = [s for s in watchlist if s not in blocked]
+        return watchlist, self._prefetch_chunk(unblocked[:self.scan_prefetch_chunk])
+    
+    def _prefetch_chunk(self, symbols: List[str]):
+        """
+        Warm the bar cache for a chunk of scan symbols on the background worker
+        
+        Returns the Future, or None for an empty chunk. Only market data is fetched
+        off-thread; analysis, SQLite access and order placement stay on the main thread.
+        """
+        if not symbols:
+            return None
+        self._pending_prefetch = self._background.submit(
+            self.data_fetcher.prefetch_daily_bars, symbols, 365, self.scan_max_workers
+        )
+        return self._pending_prefetch
+    
+    def _seconds_until_next_scan(self, scan_started: float, interval: float,
+                                 now: Optional[datetime] = None) -> float:
+        """
+        Seconds to sleep so the next scan starts `interval` after the last one started
+        
+        scan_started is a time.monotonic() reading. In the buy window, minute-based
+        intervals are additionally snapped back to the wall-clock minute boundary
+        so scans (and SignalQueue window checks) land on whole minutes.
+        """
+        sleep_for = max(0.0, scan_started + interval - time.monotonic())
+        if interval >= 60 and self.is_buy_window(now):
+            aligned = sleep_for - (time.time() + sleep_for) % 60
+            if aligned > 0:
+                sleep_for = aligned
+        return sleep_for
     
-    def _get_dynamic_scan_interval(self):
-        base_interval = self.get_scan_interval()
+    def _get_dynamic_scan_interval(self, now: Optional[datetime] = None):
+        base_interval = self.get_scan_interval(now)
         if self.signal_queue.is_window_complete() and len(self.signal_queue.signals) > 0:
             logger.info("Queue ready for execution - scanning immediately")
             return 1
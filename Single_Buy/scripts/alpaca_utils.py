@@ -0,0 +1,99 @@
+"""
+Shared helpers for the Alpaca checker scripts (check_account_status.py,
+check_positions.py): paper/live detection, HTTP session tuning and a
+short-lived on-disk response cache
+"""
+
+import os
+import hashlib
+import json
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from alpaca.trading.client import TradingClient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Short-lived response cache shared by the checker scripts
+CACHE_DIR = os.path.join('.cache', 'alpaca')
+CACHE_TTL_SECONDS = 60
+
+
+def cached_call(endpoint: str, api_key: str, fetch, model, use_cache: bool = True):
+    """
+    Return (fetch(), age), reusing a result saved by either checker script in the last minute
+    
+    Responses are stored as model_dump() JSON under CACHE_DIR keyed by endpoint
+    and API key, and rebuilt with model.model_validate (item by item for list
+    responses), so running check_account_status.py and check_positions.py back
+    to back costs one round trip per endpoint. age is None for a fresh fetch,
+    otherwise the cached response's age in seconds. use_cache=False always
+    fetches (and refreshes the cache).
+    """
+    key = hashlib.sha1(f"{endpoint}:{api_key}".encode()).hexdigest()
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    
+    if use_cache:
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if age < CACHE_TTL_SECONDS:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    return [model.model_validate(item) for item in data], age
+                return model.model_validate(data), age
+        except Exception:
+            pass  # Missing, stale-format or unreadable cache entry - fetch fresh
+    
+    result = fetch()
+    try:
+        if isinstance(result, list):
+            data = [item.model_dump(mode='json') for item in result]
+        else:
+            data = result.model_dump(mode='json')
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # Account data: readable by the owner only
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        pass  # Caching is best-effort
+    return result, None
+
+
+def cache_note(age: Optional[float]) -> str:
+    """Report suffix for a cached_call age: ' (cached, Ns old)', or '' when fetched fresh"""
+    return '' if age is None else f" (cached, {age:.0f}s old)"
+
+
+def tune_http_session(trading_client: TradingClient) -> TradingClient:
+    """
+    Give the client's requests.Session a keep-alive pool with retries
+    
+    alpaca-py already reuses one Session per client; this sizes its connection
+    pool and retries transient connection failures and 5xx responses on GET
+    (these scripts only read from the API).
+    """
+    session = getattr(trading_client, '_session', None)
+    if session is not None:
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({'GET'}), raise_on_status=False)
+        session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+    return trading_client
+
+
+def is_paper_url(base_url: Optional[str]) -> bool:
+    """
+    True if base_url is Alpaca's paper endpoint (paper-api.alpaca.markets)
+    
+    Matches on the parsed hostname rather than a substring, so a proxy URL
+    that merely contains "paper" is not mistaken for the paper API.
+    A missing URL defaults to paper, as before.
+    """
+    if not base_url:
+        return True
+    hostname = urlparse(base_url if '//' in base_url else f'//{base_url}').hostname or ''
+    return hostname.startswith('paper-')
@@ -6,6 +6,10 @@ Diagnoses account issues and restrictions
 
 import sys
 import os
+import argparse
+import contextlib
+import io
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add parent directory to path
@@ -13,10 +17,154 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from rajat_alpha_v67_single import ConfigManager
 from alpaca.trading.client import TradingClient
+from alpaca.trading.enums import QueryOrderStatus
+from alpaca.trading.models import Position, TradeAccount
+from alpaca.trading.requests import GetOrdersRequest
+from alpaca_utils import CACHE_TTL_SECONDS, cache_note, cached_call, is_paper_url, tune_http_session
 
+ACCOUNT_MONEY_FIELDS = (
+    'buying_power', 'cash', 'portfolio_value', 'equity', 'long_market_value',
+    'short_market_value', 'last_equity', 'initial_margin', 'maintenance_margin',
+)
 
-def check_account_status():
+
+def _result_or_none(future, label: str):
+    """Return a future's result, printing a warning instead of raising"""
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"⚠️  Could not fetch {label}: {e}")
+        print()
+        return None
+
+
+# ----------------------------------------------------------------------------
+# Account checks
+# Each check takes the diagnosis context (account, vals, paper, positions,
+# deployed) and returns (issue, warning, report_lines); issue/warning are
+# summary strings or None. Checks only build text - printing happens later.
+# ----------------------------------------------------------------------------
+
+def _check_buying_power(ctx):
+    buying_power = ctx['vals']['buying_power']
+    if buying_power <= 0:
+        lines = ["❌ Issue #1: Zero Buying Power",
+                 f"   Current buying power: ${buying_power:,.2f}"]
+        if ctx['paper']:
+            lines += ["   This is UNUSUAL for paper trading - paper accounts should have large buying power",
+                      "   Possible causes:",
+                      "     - Paper trading account may need to be reset",
+                      "     - Too many open positions using all allocated paper money",
+                      "     - Alpaca paper trading bug"]
+        else:
+            lines += ["   Possible causes:",
+                      "     - All capital deployed in positions",
+                      "     - Margin call or account restriction",
+                      "     - Pattern Day Trader (PDT) violation"]
+        if ctx['positions']:
+            lines.append("   Largest open positions:")
+            for pos in sorted(ctx['positions'], key=lambda p: float(p.market_value), reverse=True)[:5]:
+                lines.append(f"     {pos.symbol:<8} {float(pos.qty):>8.0f} shares  ${float(pos.market_value):>12,.2f}")
+        return f"🚨 CRITICAL: Buying power is ${buying_power:,.2f}", None, lines + [""]
+    if buying_power < 1000:
+        return (None, f"⚠️  Low buying power: ${buying_power:,.2f}",
+                [f"⚠️  Warning: Low buying power (${buying_power:,.2f})", ""])
+    return None, None, [f"✅ Buying power looks good: ${buying_power:,.2f}", ""]
+
+
+def _check_pattern_day_trader(ctx):
+    if not ctx['account'].pattern_day_trader:
+        return None, None, ["✅ No Pattern Day Trader restrictions", ""]
+    if ctx['paper']:
+        return (None, "⚠️  PDT flag set in paper account (unusual)",
+                ["⚠️  Warning: Pattern Day Trader flag is TRUE",
+                 "   This is unusual for paper trading accounts",
+                 "   PDT restrictions shouldn't apply to paper trading", ""])
+    equity = ctx['vals']['equity']
+    lines = ["❌ Issue #2: Pattern Day Trader (PDT) Restrictions",
+             "   Your account is flagged as a Pattern Day Trader",
+             "   Requirements:",
+             "     - Must maintain $25,000 minimum equity",
+             f"     - Current equity: ${equity:,.2f}"]
+    if equity < 25000:
+        lines.append("     - ⚠️  BELOW PDT MINIMUM - Trading may be restricted!")
+    return "🚨 Pattern Day Trader restrictions active", None, lines + [""]
+
+
+def _check_account_blocks(ctx):
+    account = ctx['account']
+    if account.trading_blocked:
+        return ("🚨 CRITICAL: Trading is BLOCKED", None,
+                ["❌ Issue #3: Trading Blocked",
+                 "   Trading is currently blocked on this account",
+                 "   Contact Alpaca support to resolve", ""])
+    if account.account_blocked:
+        return ("🚨 CRITICAL: Account is BLOCKED", None,
+                ["❌ Issue #4: Account Blocked",
+                 "   Account is blocked - no trading allowed",
+                 "   Contact Alpaca support immediately", ""])
+    return None, None, ["✅ No trading blocks detected", ""]
+
+
+def _check_daytrade_count(ctx):
+    account = ctx['account']
+    if account.daytrade_count >= 3 and not account.pattern_day_trader:
+        return (None, f"⚠️  High daytrade count: {account.daytrade_count}/3",
+                [f"⚠️  Warning: Close to PDT limit ({account.daytrade_count}/3 day trades)",
+                 "   One more day trade in 5 days will trigger PDT restrictions", ""])
+    return None, None, []
+
+
+def _check_paper_equity(ctx):
+    equity = ctx['vals']['equity']
+    if not (ctx['paper'] and equity < 100000):
+        return None, None, []
+    lines = [f"⚠️  Warning: Low equity for paper account (${equity:,.2f})",
+             "   Paper accounts typically start with $100,000"]
+    if ctx['positions'] is not None:
+        lines.append(f"   Capital in {len(ctx['positions'])} open positions: ${ctx['deployed']:,.2f}")
+    lines += ["   Consider resetting your paper account if needed", ""]
+    return None, f"⚠️  Paper account equity seems low: ${equity:,.2f}", lines
+
+
+# Evaluated in order; report sections appear in this order
+ACCOUNT_CHECKS = (
+    _check_buying_power,
+    _check_pattern_day_trader,
+    _check_account_blocks,
+    _check_daytrade_count,
+    _check_paper_equity,
+)
+
+
+def diagnose_account(ctx):
+    """Run ACCOUNT_CHECKS in one pass; returns (issues_found, warnings_found, report_lines)"""
+    issues_found, warnings_found, report_lines = [], [], []
+    for check in ACCOUNT_CHECKS:
+        issue, warning, lines = check(ctx)
+        if issue:
+            issues_found.append(issue)
+        if warning:
+            warnings_found.append(warning)
+        report_lines.extend(lines)
+    return issues_found, warnings_found, report_lines
+
+
+def check_account_status(use_cache: bool = True):
     """Check Alpaca account status and diagnose issues"""
+    # Render the report into memory and write it to the terminal in one call
+    # (much faster than hundreds of line-buffered prints over SSH)
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            _print_account_status(use_cache)
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
+def _print_account_status(use_cache: bool):
+    """Print the account status report to stdout"""
     
     print("=" * 80)
     print("🔍 ALPACA ACCOUNT STATUS CHECKER")
@@ -26,23 +174,37 @@ def check_account_status():
     # Load configuration
     config_manager = ConfigManager('config/config.json')
     
-    api_key = config_manager.get('api', 'key_id')
-    secret_key = config_manager.get('api', 'secret_key')
-    base_url = config_manager.get('api', 'base_url')
-    paper = 'paper' in base_url.lower() if base_url else True
+    api_cfg = config_manager.get_section('api')
+    api_key, secret_key, base_url = api_cfg.get('key_id'), api_cfg.get('secret_key'), api_cfg.get('base_url')
+    paper = is_paper_url(base_url)
     
     if not api_key or not secret_key:
         print("❌ Error: API credentials not found in config/config.json")
         return
     
     # Initialize trading client
-    trading_client = TradingClient(api_key, secret_key, paper=paper)
+    trading_client = tune_http_session(TradingClient(api_key, secret_key, paper=paper))
+    
+    # Account, positions and open orders are independent requests - issue them together
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        account_future = pool.submit(cached_call, 'account', api_key,
+                                     trading_client.get_account, TradeAccount, use_cache)
+        positions_future = pool.submit(cached_call, 'positions', api_key,
+                                       trading_client.get_all_positions, Position, use_cache)
+        orders_future = pool.submit(trading_client.get_orders,
+                                    GetOrdersRequest(status=QueryOrderStatus.OPEN))
     
     try:
         # Get account information
-        account = trading_client.get_account()
+        account, account_age = account_future.result()
+        positions, positions_age = _result_or_none(positions_future, 'open positions') or (None, None)
+        open_orders = _result_or_none(orders_future, 'open orders')
+        
+        # alpaca-py returns money fields as strings; parse each one once
+        vals = {field: float(getattr(account, field) or 0) for field in ACCOUNT_MONEY_FIELDS}
+        deployed = sum(float(pos.market_value) for pos in positions) if positions is not None else None
         
-        print("📊 ACCOUNT INFORMATION")
+        print(f"📊 ACCOUNT INFORMATION{cache_note(account_age)}")
         print("-" * 80)
         print(f"Account Number:        {account.account_number}")
         print(f"Account Status:        {account.status}")
@@ -52,12 +214,12 @@ def check_account_status():
         
         print("💵 BUYING POWER & EQUITY")
         print("-" * 80)
-        print(f"Buying Power:          ${float(account.buying_power):,.2f}")
-        print(f"Cash:                  ${float(account.cash):,.2f}")
-        print(f"Portfolio Value:       ${float(account.portfolio_value):,.2f}")
-        print(f"Equity:                ${float(account.equity):,.2f}")
-        print(f"Long Market Value:     ${float(account.long_market_value):,.2f}")
-        print(f"Short Market Value:    ${float(account.short_market_value):,.2f}")
+        print(f"Buying Power:          ${vals['buying_power']:,.2f}")
+        print(f"Cash:                  ${vals['cash']:,.2f}")
+        print(f"Portfolio Value:       ${vals['portfolio_value']:,.2f}")
+        print(f"Equity:                ${vals['equity']:,.2f}")
+        print(f"Long Market Value:     ${vals['long_market_value']:,.2f}")
+        print(f"Short Market Value:    ${vals['short_market_value']:,.2f}")
         print()
         
         print("🚨 RESTRICTIONS & LIMITATIONS")
@@ -74,9 +236,18 @@ def check_account_status():
         print("📈 TRADING ACTIVITY")
         print("-" * 80)
         print(f"Daytrade Count:        {account.daytrade_count}")
-        print(f"Last Equity:           ${float(account.last_equity):,.2f}")
-        print(f"Initial Margin:        ${float(account.initial_margin):,.2f}")
-        print(f"Maintenance Margin:    ${float(account.maintenance_margin):,.2f}")
+        print(f"Last Equity:           ${vals['last_equity']:,.2f}")
+        print(f"Initial Margin:        ${vals['initial_margin']:,.2f}")
+        print(f"Maintenance Margin:    ${vals['maintenance_margin']:,.2f}")
+        print()
+        
+        print(f"📦 OPEN POSITIONS & ORDERS{cache_note(positions_age)}")
+        print("-" * 80)
+        if positions is not None:
+            print(f"Open Positions:        {len(positions)}")
+            print(f"Capital Deployed:      ${deployed:,.2f}")
+        if open_orders is not None:
+            print(f"Open Orders:           {len(open_orders)}")
         print()
         
         # Analyze issues
@@ -85,88 +256,12 @@ def check_account_status():
         print("=" * 80)
         print()
         
-        issues_found = []
-        warnings_found = []
-        
-        # Check 1: Buying Power
-        buying_power = float(account.buying_power)
-        if buying_power <= 0:
-            issues_found.append(f"🚨 CRITICAL: Buying power is ${buying_power:,.2f}")
-            print("❌ Issue #1: Zero Buying Power")
-            print(f"   Current buying power: ${buying_power:,.2f}")
-            if paper:
-                print("   This is UNUSUAL for paper trading - paper accounts should have large buying power")
-                print("   Possible causes:")
-                print("     - Paper trading account may need to be reset")
-                print("     - Too many open positions using all allocated paper money")
-                print("     - Alpaca paper trading bug")
-            else:
-                print("   Possible causes:")
-                print("     - All capital deployed in positions")
-                print("     - Margin call or account restriction")
-                print("     - Pattern Day Trader (PDT) violation")
-            print()
-        elif buying_power < 1000:
-            warnings_found.append(f"⚠️  Low buying power: ${buying_power:,.2f}")
-            print(f"⚠️  Warning: Low buying power (${buying_power:,.2f})")
-            print()
-        else:
-            print(f"✅ Buying power looks good: ${buying_power:,.2f}")
-            print()
-        
-        # Check 2: Pattern Day Trader
-        if account.pattern_day_trader:
-            if paper:
-                warnings_found.append("⚠️  PDT flag set in paper account (unusual)")
-                print("⚠️  Warning: Pattern Day Trader flag is TRUE")
-                print("   This is unusual for paper trading accounts")
-                print("   PDT restrictions shouldn't apply to paper trading")
-                print()
-            else:
-                issues_found.append("🚨 Pattern Day Trader restrictions active")
-                print("❌ Issue #2: Pattern Day Trader (PDT) Restrictions")
-                print("   Your account is flagged as a Pattern Day Trader")
-                print("   Requirements:")
-                print("     - Must maintain $25,000 minimum equity")
-                print(f"     - Current equity: ${float(account.equity):,.2f}")
-                if float(account.equity) < 25000:
-                    print("     - ⚠️  BELOW PDT MINIMUM - Trading may be restricted!")
-                print()
-        else:
-            print("✅ No Pattern Day Trader restrictions")
-            print()
-        
-        # Check 3: Account Blocks
-        if account.trading_blocked:
-            issues_found.append("🚨 CRITICAL: Trading is BLOCKED")
-            print("❌ Issue #3: Trading Blocked")
-            print("   Trading is currently blocked on this account")
-            print("   Contact Alpaca support to resolve")
-            print()
-        elif account.account_blocked:
-            issues_found.append("🚨 CRITICAL: Account is BLOCKED")
-            print("❌ Issue #4: Account Blocked")
-            print("   Account is blocked - no trading allowed")
-            print("   Contact Alpaca support immediately")
-            print()
-        else:
-            print("✅ No trading blocks detected")
-            print()
-        
-        # Check 4: Daytrade count
-        if account.daytrade_count >= 3 and not account.pattern_day_trader:
-            warnings_found.append(f"⚠️  High daytrade count: {account.daytrade_count}/3")
-            print(f"⚠️  Warning: Close to PDT limit ({account.daytrade_count}/3 day trades)")
-            print("   One more day trade in 5 days will trigger PDT restrictions")
-            print()
-        
-        # Check 5: Paper Trading with Low Equity
-        if paper and float(account.equity) < 100000:
-            warnings_found.append(f"⚠️  Paper account equity seems low: ${float(account.equity):,.2f}")
-            print(f"⚠️  Warning: Low equity for paper account (${float(account.equity):,.2f})")
-            print("   Paper accounts typically start with $100,000")
-            print("   Consider resetting your paper account if needed")
-            print()
+        buying_power = vals['buying_power']
+        issues_found, warnings_found, report_lines = diagnose_account({
+            'account': account, 'vals': vals, 'paper': paper,
+            'positions': positions, 'deployed': deployed,
+        })
+        print("\n".join(report_lines))
         
         # Summary
         print("=" * 80)
@@ -275,4 +370,8 @@ def check_account_status():
 
 
 if __name__ == '__main__':
-    check_account_status()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Ignore API responses cached in the last {CACHE_TTL_SECONDS}s')
+    args = parser.parse_args()
+    check_account_status(use_cache=not args.no_cache)
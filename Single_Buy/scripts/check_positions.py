@@ -5,17 +5,69 @@ Position Checker - Review Open Positions and Identify Issues
 
 import sys
 import os
-from datetime import datetime, timedelta
+import argparse
+import contextlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from rajat_alpha_v67_single import ConfigManager, PositionDatabase
 from alpaca.trading.client import TradingClient
+from alpaca.trading.models import Position
+from alpaca_utils import CACHE_TTL_SECONDS, cache_note, cached_call, is_paper_url, tune_http_session
 
 
-def check_positions():
+def reconcile_positions(db_qty: dict, alpaca_qty: dict) -> dict:
+    """
+    Compare remaining quantities per symbol between the database and Alpaca
+    
+    Single pass over the union of symbols. Returns a JSON-serialisable dict:
+    db_only / alpaca_only (sorted symbol lists) and mismatches
+    [(symbol, db_qty, alpaca_qty)].
+    """
+    db_only, alpaca_only, mismatches = [], [], []
+    for symbol in sorted(db_qty.keys() | alpaca_qty.keys()):
+        if symbol not in alpaca_qty:
+            db_only.append(symbol)
+        elif symbol not in db_qty:
+            alpaca_only.append(symbol)
+        elif db_qty[symbol] != alpaca_qty[symbol]:
+            mismatches.append((symbol, db_qty[symbol], alpaca_qty[symbol]))
+    return {'db_only': db_only, 'alpaca_only': alpaca_only, 'mismatches': mismatches}
+
+
+def _days_held(entry_date, today: date) -> int:
+    """
+    Whole calendar days since entry_date
+    
+    Only the YYYY-MM-DD prefix is parsed, so plain dates and full ISO
+    timestamps (with or without microseconds) both work. Missing or
+    malformed dates count as 0 days.
+    """
+    try:
+        return (today - date.fromisoformat(entry_date[:10])).days
+    except (TypeError, ValueError):
+        return 0
+
+
+def check_positions(use_cache: bool = True):
     """Check all positions in database and Alpaca account"""
+    # Render the report into memory and write it to the terminal in one call
+    # (much faster than hundreds of line-buffered prints over SSH)
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            _print_positions(use_cache)
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
+def _print_positions(use_cache: bool):
+    """Print the positions report to stdout"""
     
     print("=" * 80)
     print("📊 POSITION CHECKER - Database vs Alpaca Account")
@@ -25,15 +77,20 @@ def check_positions():
     # Load configuration
     config_manager = ConfigManager('config/config.json')
     
-    api_key = config_manager.get('api', 'key_id')
-    secret_key = config_manager.get('api', 'secret_key')
-    base_url = config_manager.get('api', 'base_url')
-    paper = 'paper' in base_url.lower() if base_url else True
+    api_cfg = config_manager.get_section('api')
+    api_key, secret_key, base_url = api_cfg.get('key_id'), api_cfg.get('secret_key'), api_cfg.get('base_url')
+    paper = is_paper_url(base_url)
     
     # Initialize clients
-    trading_client = TradingClient(api_key, secret_key, paper=paper)
+    trading_client = tune_http_session(TradingClient(api_key, secret_key, paper=paper))
     db = PositionDatabase('db/positions.db')
     
+    # Start the Alpaca request now so it overlaps the database read
+    fetch_pool = ThreadPoolExecutor(max_workers=1)
+    alpaca_future = fetch_pool.submit(cached_call, 'positions', api_key,
+                                      trading_client.get_all_positions, Position, use_cache)
+    fetch_pool.shutdown(wait=False)
+    
     print(f"Trading Mode: {'📝 PAPER TRADING' if paper else '💰 LIVE TRADING'}")
     print(f"Database: db/positions.db")
     print()
@@ -49,23 +106,36 @@ def check_positions():
     db_positions = active_positions
     closed_positions = []  # Would need separate query
     
+    # One traversal builds the table rows and collects stuck positions
+    # (held for more than 7 days = potentially stuck)
+    position_rows = []
+    stuck_positions = []
+    if active_positions:
+        # Row template built once; symbol column widens for long tickers
+        sym_w = max(8, max(len(pos['symbol']) for pos in active_positions))
+        row = f"{{:<5}} {{:<{sym_w}}} {{:<6}} {{:<8}} ${{:<9.2f}} {{:<6}} {{:<10}}".format
+        today = date.today()
+        for pos in active_positions:
+            days_held = _days_held(pos.get('entry_date') or pos.get('entry_time'), today)
+            position_rows.append(row(pos['id'], pos['symbol'], pos['quantity'],
+                                     pos.get('remaining_qty', pos['quantity']),
+                                     pos.get('entry_price', 0), days_held, pos.get('status', 'OPEN')))
+            if days_held > 7:
+                stuck_positions.append((pos, days_held))
+    
     print(f"Total Positions: {len(db_positions)}")
     print(f"  Active: {len(active_positions)}")
     print(f"  Closed: {len(closed_positions)}")
     print()
     
     if active_positions:
+        header = f"{{:<5}} {{:<{sym_w}}} {{:<6}} {{:<8}} {{:<10}} {{:<6}} {{:<10}}".format
+        
         print("-" * 80)
-        print(f"{'ID':<5} {'Symbol':<8} {'Qty':<6} {'Remain':<8} {'Entry $':<10} {'Days':<6} {'Status':<10}")
+        print(header('ID', 'Symbol', 'Qty', 'Remain', 'Entry $', 'Days', 'Status'))
         print("-" * 80)
         
-        for pos in active_positions:
-            entry_time = datetime.fromisoformat(pos.get('entry_date', pos.get('entry_time', datetime.now().isoformat())))
-            days_held = (datetime.now() - entry_time).days
-            
-            print(f"{pos['id']:<5} {pos['symbol']:<8} {pos['quantity']:<6} "
-                  f"{pos.get('remaining_qty', pos['quantity']):<8} ${pos.get('entry_price', 0):<9.2f} "
-                  f"{days_held:<6} {pos.get('status', 'OPEN'):<10}")
+        print("\n".join(position_rows))
         print()
     else:
         print("✅ No active positions in database")
@@ -78,13 +148,20 @@ def check_positions():
     print()
     
     try:
-        alpaca_positions = trading_client.get_all_positions()
+        alpaca_positions, alpaca_age = alpaca_future.result()
+        if alpaca_age is not None:
+            print(f"Alpaca response{cache_note(alpaca_age)}")
+            print()
         
         if alpaca_positions:
             print(f"Total Open Positions: {len(alpaca_positions)}")
             print()
+            sym_w = max(8, max(len(pos.symbol) for pos in alpaca_positions))
+            header = f"{{:<{sym_w}}} {{:<8}} {{:<12}} {{:<12}} {{:<12}} {{:<10}}".format
+            row = f"{{:<{sym_w}}} {{:<8.0f}} ${{:<11.2f}} ${{:<11.2f}} {{}}${{:<10.2f}} {{:<9.2f}}%".format
+            
             print("-" * 80)
-            print(f"{'Symbol':<8} {'Qty':<8} {'Avg Entry':<12} {'Current $':<12} {'P&L $':<12} {'P&L %':<10}")
+            print(header('Symbol', 'Qty', 'Avg Entry', 'Current $', 'P&L $', 'P&L %'))
             print("-" * 80)
             
             total_pnl = 0
@@ -100,9 +177,8 @@ def check_positions():
                 
                 pnl_symbol = "🟢" if unrealized_pl > 0 else "🔴" if unrealized_pl < 0 else "⚪"
                 
-                print(f"{pos.symbol:<8} {qty:<8.0f} ${avg_entry:<11.2f} "
-                      f"${current:<11.2f} {pnl_symbol}${unrealized_pl:<10.2f} "
-                      f"{unrealized_plpc*100:<9.2f}%")
+                print(row(pos.symbol, qty, avg_entry, current, pnl_symbol, unrealized_pl,
+                          unrealized_plpc * 100))
             
             print("-" * 80)
             print(f"Total Unrealized P&L: {'🟢' if total_pnl > 0 else '🔴'}${total_pnl:,.2f}")
@@ -123,9 +199,16 @@ def check_positions():
     
     db_symbols = {p['symbol']: p for p in active_positions}
     alpaca_symbols = {p.symbol: p for p in alpaca_positions} if alpaca_positions else {}
+    alpaca_qty = {symbol: float(pos.qty) for symbol, pos in alpaca_symbols.items()}
+    
+    reconciliation = reconcile_positions(
+        {symbol: pos['remaining_qty'] for symbol, pos in db_symbols.items()}, alpaca_qty
+    )
+    db_only = reconciliation['db_only']
+    alpaca_only = reconciliation['alpaca_only']
+    mismatches = reconciliation['mismatches']
     
-    # Find positions in DB but not in Alpaca
-    db_only = set(db_symbols.keys()) - set(alpaca_symbols.keys())
+    # Positions in DB but not in Alpaca
     if db_only:
         print("⚠️  Positions in DATABASE but NOT in ALPACA:")
         for symbol in db_only:
@@ -134,31 +217,20 @@ def check_positions():
             print(f"      This position should be closed in database")
         print()
     
-    # Find positions in Alpaca but not in DB
-    alpaca_only = set(alpaca_symbols.keys()) - set(db_symbols.keys())
+    # Positions in Alpaca but not in DB
     if alpaca_only:
         print("⚠️  Positions in ALPACA but NOT in DATABASE:")
         for symbol in alpaca_only:
-            pos = alpaca_symbols[symbol]
-            print(f"   {symbol}: {float(pos.qty)} shares")
+            print(f"   {symbol}: {alpaca_qty[symbol]} shares")
             print(f"      This is unusual - position not tracked by bot")
         print()
     
-    # Find matching positions with quantity mismatches
-    matching = set(db_symbols.keys()) & set(alpaca_symbols.keys())
-    mismatches = []
-    for symbol in matching:
-        db_qty = db_symbols[symbol]['remaining_qty']
-        alpaca_qty = float(alpaca_symbols[symbol].qty)
-        
-        if db_qty != alpaca_qty:
-            mismatches.append((symbol, db_qty, alpaca_qty))
-    
+    # Matching positions with quantity mismatches
     if mismatches:
         print("⚠️  QUANTITY MISMATCHES (Database vs Alpaca):")
-        for symbol, db_qty, alpaca_qty in mismatches:
-            print(f"   {symbol}: DB shows {db_qty} shares, Alpaca shows {alpaca_qty} shares")
-            diff = alpaca_qty - db_qty
+        for symbol, db_qty, broker_qty in mismatches:
+            print(f"   {symbol}: DB shows {db_qty} shares, Alpaca shows {broker_qty} shares")
+            diff = broker_qty - db_qty
             if diff > 0:
                 print(f"      Alpaca has {diff} MORE shares than database")
             else:
@@ -175,16 +247,6 @@ def check_positions():
     print("=" * 80)
     print()
     
-    stuck_positions = []
-    
-    for pos in active_positions:
-        entry_time = datetime.fromisoformat(pos.get('entry_date', pos.get('entry_time', datetime.now().isoformat())))
-        days_held = (datetime.now() - entry_time).days
-        
-        # Position held for more than 7 days = potentially stuck
-        if days_held > 7:
-            stuck_positions.append((pos, days_held))
-    
     if stuck_positions:
         print(f"Found {len(stuck_positions)} positions held longer than 7 days:")
         print()
@@ -262,4 +324,8 @@ def check_positions():
 
 
 if __name__ == '__main__':
-    check_positions()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Ignore API responses cached in the last {CACHE_TTL_SECONDS}s')
+    args = parser.parse_args()
+    check_positions(use_cache=not args.no_cache)
@@ -10,6 +10,8 @@ This script provides database maintenance operations:
 Usage:
     python scripts/cleanup_db.py --remove-invalid    # Remove invalid signals
     python scripts/cleanup_db.py --vacuum            # Vacuum database
+    python scripts/cleanup_db.py --incremental       # Incremental vacuum (brief lock)
+    python scripts/cleanup_db.py --vacuum-into PATH  # Compacted copy, no lock on writers
     python scripts/cleanup_db.py --verify            # Verify integrity
     python scripts/cleanup_db.py --all               # Run all cleanup operations
 """
@@ -17,10 +19,21 @@ Usage:
 import sqlite3
 import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.request import pathname2url
 
 DB_PATH = 'db/positions.db'
 
+# Free pages released per --incremental run
+INCREMENTAL_VACUUM_PAGES = 1000
+
+# Indexes backing the maintenance queries below
+MAINTENANCE_INDEXES = {
+    'idx_pos_status_exit': 'CREATE INDEX IF NOT EXISTS idx_pos_status_exit ON positions(status, exit_date)',
+    'idx_pe_position_id': 'CREATE INDEX IF NOT EXISTS idx_pe_position_id ON partial_exits(position_id)',
+}
+
 
 def check_database_exists() -> bool:
     """Check if database file exists"""
@@ -30,40 +43,80 @@ def check_database_exists() -> bool:
     return True
 
 
-def remove_invalid_signals():
+def open_connection() -> sqlite3.Connection:
+    """Open the database once for all maintenance operations, tuned for bulk work"""
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute('PRAGMA journal_mode=WAL')  # Same mode the bot uses; readers don't block
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')  # 64 MB page cache
+    return conn
+
+
+def ensure_indexes(conn: sqlite3.Connection):
+    """Create missing maintenance indexes and refresh planner statistics if any were added"""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    missing = [name for name in MAINTENANCE_INDEXES if name not in existing]
+    
+    for name in missing:
+        conn.execute(MAINTENANCE_INDEXES[name])
+    if missing:
+        conn.execute('ANALYZE')
+        conn.commit()
+        print(f"\n🔧 Created indexes: {', '.join(missing)}")
+
+
+def ensure_index_for_query(conn: sqlite3.Connection, query: str, params: tuple, index_sql: str) -> bool:
+    """
+    Create an index when the planner would answer query with a full table scan
+    
+    Checks EXPLAIN QUERY PLAN first, so an existing index (under any name) is
+    left alone. Returns True if the index was created.
+    """
+    plan = conn.execute(f'EXPLAIN QUERY PLAN {query}', params).fetchall()
+    if not any(detail.startswith('SCAN') and 'INDEX' not in detail for *_, detail in plan):
+        return False
+    conn.execute(index_sql)
+    conn.commit()
+    return True
+
+
+def remove_invalid_signals(conn: sqlite3.Connection):
     """Remove all signals with score <= 0"""
     print('\n' + '=' * 80)
     print('REMOVING INVALID SIGNALS')
     print('=' * 80)
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    # The DELETE (and later cleanups) then only touch the matching range
+    if ensure_index_for_query(conn, 'SELECT 1 FROM signal_history WHERE score <= 0', (),
+                              'CREATE INDEX IF NOT EXISTS idx_signal_score ON signal_history(score)'):
+        print("\n🔧 Created index: idx_signal_score")
     
-    # Check current count
-    cursor.execute('SELECT COUNT(*) FROM signal_history')
-    total_before = cursor.fetchone()[0]
+    cursor = conn.cursor()
     
-    cursor.execute('SELECT COUNT(*) FROM signal_history WHERE score <= 0')
-    invalid_count = cursor.fetchone()[0]
+    # Total and invalid counts in a single pass
+    cursor.execute('''
+        SELECT COUNT(*), COALESCE(SUM(CASE WHEN score <= 0 THEN 1 ELSE 0 END), 0)
+        FROM signal_history
+    ''')
+    total_before, invalid_count = cursor.fetchone()
     
     print(f"\n📊 Before cleanup: {total_before} total signals")
     print(f"   Invalid signals to remove: {invalid_count}")
     
     if invalid_count == 0:
         print("\n✅ No invalid signals found - database is clean!")
-        conn.close()
         return
     
     # Remove invalid signals
     cursor.execute('DELETE FROM signal_history WHERE score <= 0')
+    removed = cursor.rowcount
     conn.commit()
     
-    # Check after cleanup
-    cursor.execute('SELECT COUNT(*) FROM signal_history')
-    total_after = cursor.fetchone()[0]
+    total_after = total_before - removed
     
     print(f"\n✅ After cleanup: {total_after} valid signals remaining")
-    print(f"   Removed: {invalid_count} invalid signals")
+    print(f"   Removed: {removed} invalid signals")
     
     # Show remaining signal distribution
     cursor.execute('''
@@ -79,79 +132,206 @@ def remove_invalid_signals():
     print("\n📈 Remaining signal distribution:")
     for score, count in score_dist:
         print(f"   Score {score:.0f}: {count} signals")
-    
-    conn.close()
 
 
-def archive_old_positions(days: int = 90):
-    """Archive closed positions older than specified days"""
+def archive_old_positions(conn: sqlite3.Connection, days: int = 90):
+    """
+    Archive closed positions older than specified days
+    
+    Rows move to positions_archive (and their partial exits to
+    partial_exits_archive, so no orphans are left behind) in a single
+    transaction. Run --vacuum afterwards to return the space.
+    """
     print('\n' + '=' * 80)
     print(f'ARCHIVING POSITIONS OLDER THAN {days} DAYS')
     print('=' * 80)
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     cutoff_date = (datetime.now() - timedelta(days=days)).date().isoformat()
+    old_positions = "SELECT id FROM positions WHERE status = 'CLOSED' AND exit_date < ?"
     
-    cursor.execute('''
-        SELECT COUNT(*) FROM positions 
-        WHERE status = 'CLOSED' AND exit_date < ?
-    ''', (cutoff_date,))
-    old_count = cursor.fetchone()[0]
+    if ensure_index_for_query(conn, old_positions, (cutoff_date,),
+                              MAINTENANCE_INDEXES['idx_pos_status_exit']):
+        print("\n🔧 Created index: idx_pos_status_exit")
     
-    print(f"\n📊 Found {old_count} closed positions older than {cutoff_date}")
+    conn.commit()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('CREATE TABLE IF NOT EXISTS positions_archive AS SELECT * FROM positions WHERE 0')
+        conn.execute('CREATE TABLE IF NOT EXISTS partial_exits_archive AS SELECT * FROM partial_exits WHERE 0')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_archive_exit ON positions_archive(exit_date)')
+        
+        archived = conn.execute(
+            f'INSERT INTO positions_archive SELECT * FROM positions WHERE id IN ({old_positions})',
+            (cutoff_date,)
+        ).rowcount
+        archived_exits = conn.execute(
+            f'INSERT INTO partial_exits_archive SELECT * FROM partial_exits WHERE position_id IN ({old_positions})',
+            (cutoff_date,)
+        ).rowcount
+        conn.execute(f'DELETE FROM partial_exits WHERE position_id IN ({old_positions})', (cutoff_date,))
+        conn.execute(f'DELETE FROM positions WHERE id IN ({old_positions})', (cutoff_date,))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    
+    if archived == 0:
+        print(f"\n✅ No closed positions older than {cutoff_date} to archive")
+        return
     
-    if old_count == 0:
-        print("✅ No old positions to archive")
-        conn.close()
+    print(f"\n✅ Archived {archived} closed positions older than {cutoff_date}")
+    print(f"   Partial exits archived: {archived_exits}")
+    print("   Run --vacuum to reclaim the freed space")
+
+
+def _page_stats(conn: sqlite3.Connection):
+    """(page_count, freelist_count, page_size) - independent of WAL checkpoint state"""
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    freelist_count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    return page_count, freelist_count, page_size
+
+
+def _physical_size() -> int:
+    """Bytes on disk for the main file plus any un-checkpointed WAL"""
+    wal_path = DB_PATH + '-wal'
+    wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    return os.path.getsize(DB_PATH) + wal_size
+
+
+def _print_table_occupancy(conn: sqlite3.Connection):
+    """Per-table/index page usage from the dbstat virtual table, when compiled in"""
+    try:
+        rows = conn.execute(
+            'SELECT name, COUNT(*), SUM(pgsize) FROM dbstat '
+            'GROUP BY name ORDER BY SUM(pgsize) DESC'
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return  # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+    print("\n📦 Occupancy by table/index:")
+    for name, pages, size in rows:
+        print(f"   {name:<25} {pages:>6} pages  {size / 1024:>10.2f} KB")
+
+
+def vacuum_database(conn: sqlite3.Connection, incremental: bool = False):
+    """
+    Reclaim free pages
+    
+    Full mode rewrites the file with VACUUM (exclusive lock for the duration)
+    and switches the database to auto_vacuum=INCREMENTAL so later runs can use
+    incremental mode, which only releases up to INCREMENTAL_VACUUM_PAGES free
+    pages and holds the write lock briefly.
+    """
+    print('\n' + '=' * 80)
+    print('VACUUMING DATABASE' + (' (INCREMENTAL)' if incremental else ''))
+    print('=' * 80)
+    
+    conn.commit()  # VACUUM cannot run inside a transaction
+    page_count, freelist_before, page_size = _page_stats(conn)
+    physical_before = _physical_size()
+    print(f"\n📊 Before: {page_count} pages ({page_count * page_size / 1024:.2f} KB logical, "
+          f"{physical_before / 1024:.2f} KB physical), {freelist_before} free")
+    _print_table_occupancy(conn)
+    
+    auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    if incremental and auto_vacuum != 2:
+        print("⚠️  Incremental vacuum is not enabled for this database yet -")
+        print("   run --vacuum once (full) to enable it")
         return
     
-    # Note: In production, you might want to move to an archive table
-    # For now, we'll just report what could be archived
-    print(f"\n💡 To implement archiving, consider:")
-    print(f"   1. Create an archive table")
-    print(f"   2. Move old records to archive")
-    print(f"   3. Keep main table lean for performance")
+    if incremental:
+        conn.execute(f'PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})').fetchall()
+    else:
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')  # Takes effect with this VACUUM
+        conn.execute('VACUUM')
+    conn.commit()
+    # Fold the rewritten pages back into the main file
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    
+    page_count_after, freelist_after, _ = _page_stats(conn)
+    reclaimed = page_count - page_count_after
     
-    conn.close()
+    physical_after = _physical_size()
+    
+    print(f"\n✅ After: {page_count_after} pages ({page_count_after * page_size / 1024:.2f} KB logical, "
+          f"{physical_after / 1024:.2f} KB physical), {freelist_after} free")
+    print(f"   Space reclaimed: {reclaimed * page_size / 1024:.2f} KB ({reclaimed} pages), "
+          f"{(physical_before - physical_after) / 1024:.2f} KB on disk")
 
 
-def vacuum_database():
-    """Vacuum database to reclaim space"""
+def vacuum_into(conn: sqlite3.Connection, target_path: str):
+    """
+    Write a compacted copy of the database to target_path (VACUUM INTO)
+    
+    Readers and the bot's writes are not blocked. The copy is not swapped in
+    automatically: replacing positions.db while the bot has it open would
+    leave the bot writing to the old file.
+    """
     print('\n' + '=' * 80)
-    print('VACUUMING DATABASE')
+    print(f'VACUUM INTO {target_path}')
     print('=' * 80)
     
-    # Get file size before
-    size_before = os.path.getsize(DB_PATH)
-    print(f"\n📊 Database size before: {size_before / 1024:.2f} KB")
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('VACUUM')
-    conn.close()
+    if os.path.exists(target_path):
+        print(f"\n❌ {target_path} already exists - choose a new path")
+        return
     
-    # Get file size after
-    size_after = os.path.getsize(DB_PATH)
-    saved = size_before - size_after
+    conn.commit()
+    conn.execute('VACUUM INTO ?', (target_path,))
     
-    print(f"✅ Database size after: {size_after / 1024:.2f} KB")
-    print(f"   Space reclaimed: {saved / 1024:.2f} KB ({(saved/size_before)*100:.1f}%)")
+    page_count, _, page_size = _page_stats(conn)
+    print(f"\n✅ Compacted copy: {os.path.getsize(target_path) / 1024:.2f} KB "
+          f"(live database: {page_count * page_size / 1024:.2f} KB)")
+    print(f"   To use it, stop the bot and move it over {DB_PATH}")
 
 
-def verify_integrity():
+# Read-only integrity queries; independent, so verify_integrity runs them concurrently
+INTEGRITY_QUERIES = {
+    'integrity': 'PRAGMA integrity_check',
+    'orphaned': '''
+        SELECT COUNT(*) FROM partial_exits pe
+        WHERE NOT EXISTS (SELECT 1 FROM positions p WHERE p.id = pe.position_id)
+    ''',
+    'invalid_qty': '''
+        SELECT COUNT(*) FROM positions
+        WHERE remaining_qty > quantity OR remaining_qty < 0
+    ''',
+    'stats': '''
+        SELECT
+            (SELECT COUNT(*) FROM positions),
+            (SELECT COUNT(*) FROM positions WHERE status = 'OPEN'),
+            (SELECT COUNT(*) FROM signal_history),
+            (SELECT COUNT(*) FROM partial_exits)
+    ''',
+}
+
+
+def _query_readonly(query: str) -> tuple:
+    """Run one query on its own read-only connection and return the first row"""
+    uri = f"file:{pathname2url(os.path.abspath(DB_PATH))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        return conn.execute(query).fetchone()
+    finally:
+        conn.close()
+
+
+def verify_integrity(conn: sqlite3.Connection):
     """Verify database integrity"""
     print('\n' + '=' * 80)
     print('VERIFYING DATABASE INTEGRITY')
     print('=' * 80)
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    ensure_indexes(conn)
+    conn.commit()
+    
+    # WAL lets separate read-only connections run these in parallel (sqlite3
+    # releases the GIL while stepping); the full integrity_check dominates
+    with ThreadPoolExecutor(max_workers=len(INTEGRITY_QUERIES)) as pool:
+        futures = {name: pool.submit(_query_readonly, query) for name, query in INTEGRITY_QUERIES.items()}
+        results = {name: future.result() for name, future in futures.items()}
     
     # Run integrity check
-    cursor.execute('PRAGMA integrity_check')
-    result = cursor.fetchone()[0]
+    result = results['integrity'][0]
     
     if result == 'ok':
         print("\n✅ Database integrity check: PASSED")
@@ -160,12 +340,7 @@ def verify_integrity():
         print(f"   Error: {result}")
     
     # Check for orphaned partial_exits
-    cursor.execute('''
-        SELECT COUNT(*) FROM partial_exits pe
-        LEFT JOIN positions p ON pe.position_id = p.id
-        WHERE p.id IS NULL
-    ''')
-    orphaned = cursor.fetchone()[0]
+    orphaned = results['orphaned'][0]
     
     if orphaned > 0:
         print(f"\n⚠️  Found {orphaned} orphaned partial_exit records")
@@ -173,11 +348,7 @@ def verify_integrity():
         print("\n✅ No orphaned records found")
     
     # Check for positions with invalid quantities
-    cursor.execute('''
-        SELECT COUNT(*) FROM positions
-        WHERE remaining_qty > quantity OR remaining_qty < 0
-    ''')
-    invalid_qty = cursor.fetchone()[0]
+    invalid_qty = results['invalid_qty'][0]
     
     if invalid_qty > 0:
         print(f"\n⚠️  Found {invalid_qty} positions with invalid quantities")
@@ -187,23 +358,11 @@ def verify_integrity():
     # Show database statistics
     print("\n📊 Database Statistics:")
     
-    cursor.execute('SELECT COUNT(*) FROM positions')
-    total_positions = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM positions WHERE status = "OPEN"')
-    open_positions = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM signal_history')
-    total_signals = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM partial_exits')
-    total_partial_exits = cursor.fetchone()[0]
+    total_positions, open_positions, total_signals, total_partial_exits = results['stats']
     
     print(f"   Total positions: {total_positions} ({open_positions} open)")
     print(f"   Total signals: {total_signals}")
     print(f"   Total partial exits: {total_partial_exits}")
-    
-    conn.close()
 
 
 def main():
@@ -219,6 +378,10 @@ def main():
                        help='Archive closed positions older than DAYS')
     parser.add_argument('--vacuum', action='store_true',
                        help='Vacuum database to reclaim space')
+    parser.add_argument('--incremental', action='store_true',
+                       help=f'Vacuum incrementally (up to {INCREMENTAL_VACUUM_PAGES} pages, brief lock)')
+    parser.add_argument('--vacuum-into', metavar='PATH',
+                       help='Write a compacted copy of the database to PATH')
     parser.add_argument('--verify', action='store_true',
                        help='Verify database integrity')
     parser.add_argument('--all', action='store_true',
@@ -234,18 +397,25 @@ def main():
         parser.print_help()
         return
     
-    # Execute requested operations
-    if args.remove_invalid or args.all:
-        remove_invalid_signals()
-    
-    if args.archive:
-        archive_old_positions(args.archive)
-    
-    if args.vacuum or args.all:
-        vacuum_database()
-    
-    if args.verify or args.all:
-        verify_integrity()
+    # Execute requested operations on one shared connection
+    conn = open_connection()
+    try:
+        if args.remove_invalid or args.all:
+            remove_invalid_signals(conn)
+        
+        if args.archive:
+            archive_old_positions(conn, args.archive)
+        
+        if args.vacuum or args.incremental or args.all:
+            vacuum_database(conn, incremental=args.incremental)
+        
+        if args.vacuum_into:
+            vacuum_into(conn, args.vacuum_into)
+        
+        if args.verify or args.all:
+            verify_integrity(conn)
+    finally:
+        conn.close()
     
     print('\n' + '=' * 80)
     print('✅ CLEANUP COMPLETE')
@@ -17,12 +17,43 @@ Usage:
 
 import sqlite3
 import argparse
+import contextlib
+import io
 import os
+import sys
 from datetime import datetime, timedelta
+from operator import itemgetter
 from typing import List, Tuple
 
 DB_PATH = 'db/positions.db'
 
+# Fixed SQL text per filter combination, so repeated calls hit sqlite3's
+# prepared-statement cache and filter values are always bound, never inlined
+# (each position row also carries the total, so results can be streamed after the header)
+# Nullable numeric columns are defaulted in SQL so the formatting below needs no None checks
+_POS_COLUMNS = '''
+    id, symbol, entry_date, entry_price, quantity, remaining_qty, stop_loss, status,
+    exit_date, COALESCE(exit_price, 0) AS exit_price, COALESCE(profit_loss_pct, 0) AS profit_loss_pct,
+    exit_reason, COALESCE(score, 0) AS score, pattern
+'''
+_SQL_POS_ALL = f'SELECT {_POS_COLUMNS} FROM positions ORDER BY entry_date DESC'
+_SQL_POS_FILTERED = f'SELECT {_POS_COLUMNS} FROM positions WHERE status = ? ORDER BY entry_date DESC'
+
+# Keyed by (has_min_score, has_date_filter); parameters follow in that order, then LIMIT
+_SQL_SIGNALS = {
+    (False, False): 'SELECT * FROM signal_history ORDER BY created_at DESC LIMIT ?',
+    (True, False): 'SELECT * FROM signal_history WHERE score >= ? ORDER BY created_at DESC LIMIT ?',
+    (False, True): 'SELECT * FROM signal_history WHERE signal_date = ? ORDER BY created_at DESC LIMIT ?',
+    (True, True): 'SELECT * FROM signal_history WHERE score >= ? AND signal_date = ? '
+                  'ORDER BY created_at DESC LIMIT ?',
+}
+
+# Unpack the displayed columns of a row in one call
+_POS_GET = itemgetter('id', 'symbol', 'entry_date', 'entry_price', 'quantity', 'remaining_qty',
+                      'stop_loss', 'status', 'score', 'pattern')
+_POS_EXIT_GET = itemgetter('exit_date', 'exit_price', 'profit_loss_pct', 'exit_reason')
+_SIG_GET = itemgetter('symbol', 'signal_date', 'score', 'pattern', 'price', 'reason', 'executed', 'created_at')
+
 
 def check_database_exists() -> bool:
     """Check if database file exists"""
@@ -34,9 +65,14 @@ def check_database_exists() -> bool:
 
 
 def get_connection() -> sqlite3.Connection:
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
+    """Get a read-only database connection"""
+    # Autocommit: reads never hold a transaction open against the bot's WAL writes
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     conn.row_factory = sqlite3.Row  # Enable column access by name
+    conn.execute('PRAGMA query_only=1')
+    conn.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
     return conn
 
 
@@ -47,29 +83,38 @@ def show_tables():
     print('=' * 80)
     
     conn = get_connection()
+    conn.row_factory = None  # Positional access only; plain tuples skip the Row wrapper
     cursor = conn.cursor()
     
-    # Get all tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = cursor.fetchall()
-    
-    for table_row in tables:
-        table_name = table_row[0]
+    # Every table's columns in one query (table_info rows: cid, name, type, notnull, dflt_value, pk)
+    cursor.execute('''
+        SELECT m.name, p.cid, p.name, p.type, p."notnull", p.dflt_value, p.pk
+        FROM sqlite_master m JOIN pragma_table_info(m.name) p
+        WHERE m.type = 'table'
+        ORDER BY m.rowid, p.cid
+    ''')
+    columns_by_table = {}
+    for table_name, *col in cursor.fetchall():
+        columns_by_table.setdefault(table_name, []).append(col)
+    
+    # ...and every row count in a single SELECT
+    tables = list(columns_by_table)
+    counts = []
+    if tables:
+        cursor.execute('SELECT ' + ', '.join(
+            '(SELECT COUNT(*) FROM "{}")'.format(name.replace('"', '""')) for name in tables
+        ))
+        counts = cursor.fetchone()
+    
+    for table_name, count in zip(tables, counts):
         print(f'\n📊 Table: {table_name}')
         print('-' * 80)
         
-        # Get schema
-        cursor.execute(f'PRAGMA table_info({table_name})')
-        columns = cursor.fetchall()
-        
-        for col in columns:
+        for col in columns_by_table[table_name]:
             nullable = 'NULL' if col[3] == 0 else 'NOT NULL'
             default = f' DEFAULT {col[4]}' if col[4] else ''
             print(f'   {col[1]:<20} {col[2]:<15} {nullable}{default}')
         
-        # Get row count
-        cursor.execute(f'SELECT COUNT(*) FROM {table_name}')
-        count = cursor.fetchone()[0]
         print(f'\n   Total records: {count}')
     
     conn.close()
@@ -84,12 +129,11 @@ def show_positions(status_filter: str = None):
     conn = get_connection()
     cursor = conn.cursor()
     
-    query = 'SELECT * FROM positions'
     if status_filter:
-        query += f' WHERE status = "{status_filter.upper()}"'
-    query += ' ORDER BY entry_date DESC'
+        cursor.execute(_SQL_POS_FILTERED, (status_filter.upper(),))
+    else:
+        cursor.execute(_SQL_POS_ALL)
     
-    cursor.execute(query)
     positions = cursor.fetchall()
     
     if not positions:
@@ -100,20 +144,22 @@ def show_positions(status_filter: str = None):
     print(f'\nTotal: {len(positions)} positions\n')
     
     for pos in positions:
-        status_emoji = '🟢' if pos['status'] == 'OPEN' else '🔴'
-        print(f"{status_emoji} ID {pos['id']}: {pos['symbol']}")
-        print(f"   Entry: {pos['entry_date']} @ ${pos['entry_price']:.2f}")
-        print(f"   Quantity: {pos['quantity']} (Remaining: {pos['remaining_qty']})")
-        print(f"   Stop Loss: ${pos['stop_loss']:.2f}")
-        print(f"   Status: {pos['status']}")
+        pid, symbol, entry_date, entry_price, quantity, remaining_qty, stop_loss, status, score, pattern = _POS_GET(pos)
+        status_emoji = '🟢' if status == 'OPEN' else '🔴'
+        print(f"{status_emoji} ID {pid}: {symbol}")
+        print(f"   Entry: {entry_date} @ ${entry_price:.2f}")
+        print(f"   Quantity: {quantity} (Remaining: {remaining_qty})")
+        print(f"   Stop Loss: ${stop_loss:.2f}")
+        print(f"   Status: {status}")
         
-        if pos['status'] == 'CLOSED':
-            pnl_emoji = '📈' if pos['profit_loss_pct'] and pos['profit_loss_pct'] > 0 else '📉'
-            print(f"   Exit: {pos['exit_date']} @ ${pos['exit_price']:.2f}")
-            print(f"   {pnl_emoji} P/L: {pos['profit_loss_pct']:.2f}%")
-            print(f"   Reason: {pos['exit_reason']}")
+        if status == 'CLOSED':
+            exit_date, exit_price, pnl_pct, exit_reason = _POS_EXIT_GET(pos)
+            pnl_emoji = '📈' if pnl_pct > 0 else '📉'
+            print(f"   Exit: {exit_date} @ ${exit_price:.2f}")
+            print(f"   {pnl_emoji} P/L: {pnl_pct:.2f}%")
+            print(f"   Reason: {exit_reason}")
         
-        print(f"   Score: {pos['score']:.1f} | Pattern: {pos['pattern']}")
+        print(f"   Score: {score:.1f} | Pattern: {pattern}")
         print()
     
     conn.close()
@@ -128,45 +174,43 @@ def show_signals(limit: int = 20, min_score: float = None, date_filter: str = No
     conn = get_connection()
     cursor = conn.cursor()
     
-    query = 'SELECT * FROM signal_history WHERE 1=1'
     params = []
     
     if min_score is not None:
-        query += ' AND score >= ?'
         params.append(min_score)
     
     if date_filter:
-        query += ' AND signal_date = ?'
         params.append(date_filter)
     
-    query += ' ORDER BY created_at DESC LIMIT ?'
     params.append(limit)
     
-    cursor.execute(query, params)
-    signals = cursor.fetchall()
+    cursor.execute(_SQL_SIGNALS[(min_score is not None, bool(date_filter))], params)
+    
+    # Format while streaming; the count header is printed ahead of the (LIMIT-bounded) lines
+    lines = []
+    for sig in cursor:
+        symbol, signal_date, score, pattern, price, reason, executed, created_at = _SIG_GET(sig)
+        exec_emoji = '✅' if executed else '⏳'
+        score_emoji = '🌟' if score >= 4 else '⭐' if score >= 3 else '💫' if score >= 2 else '·'
+        
+        lines.append(f"{exec_emoji} {score_emoji} {symbol:<6} | Score: {score:4.1f} | {signal_date}\n"
+                     f"   Pattern: {pattern:<15} | Price: ${price:.2f}\n"
+                     f"   Reason: {reason}\n"
+                     f"   Created: {created_at} | Executed: {executed}\n")
     
-    if not signals:
+    if not lines:
         print('No signals found matching criteria')
         conn.close()
         return
     
-    print(f'\nShowing {len(signals)} signals\n')
-    
-    for sig in signals:
-        exec_emoji = '✅' if sig['executed'] else '⏳'
-        score_emoji = '🌟' if sig['score'] >= 4 else '⭐' if sig['score'] >= 3 else '💫' if sig['score'] >= 2 else '·'
-        
-        print(f"{exec_emoji} {score_emoji} {sig['symbol']:<6} | Score: {sig['score']:4.1f} | {sig['signal_date']}")
-        print(f"   Pattern: {sig['pattern']:<15} | Price: ${sig['price']:.2f}")
-        print(f"   Reason: {sig['reason']}")
-        print(f"   Created: {sig['created_at']} | Executed: {sig['executed']}")
-        print()
+    print(f'\nShowing {len(lines)} signals\n')
+    print('\n'.join(lines))
     
     conn.close()
 
 
-def show_performance_stats():
-    """Show performance statistics"""
+def show_performance_stats(today: str = None):
+    """Show performance statistics (today: ISO date for the signal count, defaults to now)"""
     print('\n' + '=' * 80)
     print('PERFORMANCE STATISTICS')
     print('=' * 80)
@@ -174,17 +218,17 @@ def show_performance_stats():
     conn = get_connection()
     cursor = conn.cursor()
     
-    # Overall stats
+    # Overall stats and open count in one pass over positions
     cursor.execute('''
         SELECT 
-            COUNT(*) as total_trades,
-            AVG(profit_loss_pct) as avg_pnl,
-            MAX(profit_loss_pct) as max_profit,
-            MIN(profit_loss_pct) as max_loss,
-            SUM(CASE WHEN profit_loss_pct > 0 THEN 1 ELSE 0 END) as wins,
-            SUM(CASE WHEN profit_loss_pct <= 0 THEN 1 ELSE 0 END) as losses
-        FROM positions 
-        WHERE status = 'CLOSED'
+            COUNT(CASE WHEN status = 'CLOSED' THEN 1 END) as total_trades,
+            AVG(CASE WHEN status = 'CLOSED' THEN profit_loss_pct END) as avg_pnl,
+            MAX(CASE WHEN status = 'CLOSED' THEN profit_loss_pct END) as max_profit,
+            MIN(CASE WHEN status = 'CLOSED' THEN profit_loss_pct END) as max_loss,
+            COUNT(CASE WHEN status = 'CLOSED' AND profit_loss_pct > 0 THEN 1 END) as wins,
+            COUNT(CASE WHEN status = 'CLOSED' AND profit_loss_pct <= 0 THEN 1 END) as losses,
+            COUNT(CASE WHEN status = 'OPEN' THEN 1 END) as open_count
+        FROM positions
     ''')
     stats = cursor.fetchone()
     
@@ -199,52 +243,54 @@ def show_performance_stats():
     else:
         print("\nNo closed trades yet")
     
-    # Performance by Score
-    print(f"\n📈 Performance by Signal Score:")
+    # Score and pattern breakdowns in one statement. The score groups are read
+    # in order from idx_pos_status_score_round (no per-row ROUND or GROUP BY sort)
     cursor.execute('''
-        SELECT 
-            ROUND(score) as score_group,
-            COUNT(*) as trades,
-            AVG(profit_loss_pct) as avg_pnl,
-            SUM(CASE WHEN profit_loss_pct > 0 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as win_rate
-        FROM positions 
-        WHERE status = 'CLOSED' AND score IS NOT NULL
-        GROUP BY score_group
-        ORDER BY score_group DESC
+        WITH breakdown AS (
+            SELECT 
+                'score' as kind,
+                ROUND(score) as grp,
+                COUNT(*) as trades,
+                AVG(profit_loss_pct) as avg_pnl,
+                SUM(CASE WHEN profit_loss_pct > 0 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as win_rate
+            FROM positions
+            WHERE status = 'CLOSED' AND ROUND(score) IS NOT NULL
+            GROUP BY grp
+            UNION ALL
+            SELECT 
+                'pattern',
+                pattern,
+                COUNT(*),
+                AVG(profit_loss_pct),
+                SUM(CASE WHEN profit_loss_pct > 0 THEN 1 ELSE 0 END) * 100.0 / COUNT(*)
+            FROM positions
+            WHERE status = 'CLOSED' AND pattern IS NOT NULL
+            GROUP BY pattern
+        )
+        SELECT * FROM breakdown
+        ORDER BY kind DESC, CASE WHEN kind = 'score' THEN -grp ELSE -win_rate END
     ''')
-    score_stats = cursor.fetchall()
+    breakdown = cursor.fetchall()
     
-    for stat in score_stats:
-        print(f"   Score {stat['score_group']:.0f}: {stat['trades']} trades | "
-              f"Win Rate: {stat['win_rate']:.1f}% | Avg P/L: {stat['avg_pnl']:.2f}%")
+    # Performance by Score
+    print(f"\n📈 Performance by Signal Score:")
+    for stat in breakdown:
+        if stat['kind'] == 'score':
+            print(f"   Score {stat['grp']:.0f}: {stat['trades']} trades | "
+                  f"Win Rate: {stat['win_rate']:.1f}% | Avg P/L: {stat['avg_pnl']:.2f}%")
     
     # Performance by Pattern
     print(f"\n🎯 Performance by Pattern:")
-    cursor.execute('''
-        SELECT 
-            pattern,
-            COUNT(*) as trades,
-            AVG(profit_loss_pct) as avg_pnl,
-            SUM(CASE WHEN profit_loss_pct > 0 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as win_rate
-        FROM positions 
-        WHERE status = 'CLOSED' AND pattern IS NOT NULL
-        GROUP BY pattern
-        ORDER BY win_rate DESC
-    ''')
-    pattern_stats = cursor.fetchall()
+    for stat in breakdown:
+        if stat['kind'] == 'pattern':
+            print(f"   {stat['grp']:<15}: {stat['trades']} trades | "
+                  f"Win Rate: {stat['win_rate']:.1f}% | Avg P/L: {stat['avg_pnl']:.2f}%")
     
-    for stat in pattern_stats:
-        print(f"   {stat['pattern']:<15}: {stat['trades']} trades | "
-              f"Win Rate: {stat['win_rate']:.1f}% | Avg P/L: {stat['avg_pnl']:.2f}%")
-    
-    # Current open positions
-    cursor.execute("SELECT COUNT(*) as count FROM positions WHERE status = 'OPEN'")
-    open_count = cursor.fetchone()['count']
     print(f"\n💼 Current Status:")
-    print(f"   Open Positions: {open_count}")
+    print(f"   Open Positions: {stats['open_count']}")
     
     # Recent signal activity
-    today = datetime.now().date().isoformat()
+    today = today or datetime.now().date().isoformat()
     cursor.execute("SELECT COUNT(*) as count FROM signal_history WHERE signal_date = ?", (today,))
     today_signals = cursor.fetchone()['count']
     print(f"   Signals Today: {today_signals}")
@@ -252,9 +298,9 @@ def show_performance_stats():
     conn.close()
 
 
-def show_dashboard():
+def show_dashboard(today: str = None):
     """Show comprehensive dashboard"""
-    show_performance_stats()
+    show_performance_stats(today)
     print("\n")
     show_positions(status_filter='OPEN')
     print("\n")
@@ -289,7 +335,21 @@ def main():
         parser.print_help()
         return
     
-    # Execute requested commands
+    # One date for every command in this run
+    today = datetime.now().date().isoformat()
+    
+    # Render the reports into memory and write them to the terminal in one call
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            _run_commands(args, today)
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
+def _run_commands(args: argparse.Namespace, today: str):
+    """Execute the requested report commands"""
     if args.tables:
         show_tables()
     
@@ -308,14 +368,13 @@ def main():
         show_signals(limit=args.limit, min_score=2.0)
     
     if args.signals_today:
-        today = datetime.now().date().isoformat()
         show_signals(date_filter=today, limit=100)
     
     if args.stats:
-        show_performance_stats()
+        show_performance_stats(today)
     
     if args.all:
-        show_dashboard()
+        show_dashboard(today)
 
 
 if __name__ == "__main__":
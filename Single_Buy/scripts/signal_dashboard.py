@@ -12,25 +12,78 @@ Usage:
 
 import sqlite3
 import argparse
+import contextlib
+import io
 import os
+import re
+import sys
 import time
 from datetime import datetime
 from typing import List, Tuple
 
 DB_PATH = 'db/positions.db'
 
+# Signal classification by pattern name (candlestick pattern vs MA touch)
+_PATTERN_RE = re.compile('Engulfing|Piercing|Tweezer')
+_TOUCH_RE = re.compile('EMA21|SMA50')
+
+# Fixed, parameterised statements so watch mode reuses the connection's
+# prepared-statement cache instead of re-parsing them on every refresh
+SQL_VALID_SIGNALS = '''
+    SELECT id, symbol, signal_date, score, pattern, price, reason, executed, created_at 
+    FROM signal_history 
+    WHERE signal_date = ? AND score > 0 
+    ORDER BY score DESC, created_at DESC
+'''
+# Per-pattern breakdown plus one 'open_positions' row carrying the open position count
+SQL_SIGNAL_SUMMARY = '''
+    SELECT 'pattern' as kind, pattern, COUNT(*) as count, AVG(score) as avg_score,
+           SUM(executed != 0) as executed_count
+    FROM signal_history
+    WHERE signal_date = ? AND score > 0
+    GROUP BY pattern
+    UNION ALL
+    SELECT 'open_positions', NULL, COUNT(*), NULL, NULL
+    FROM positions
+    WHERE status = 'OPEN'
+    ORDER BY kind DESC, count DESC
+'''
+
+
+def open_connection() -> sqlite3.Connection:
+    """Open the read-only dashboard connection (kept for the whole watch session)"""
+    # Autocommit: reads never hold a transaction open against the bot's WAL writes
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, cached_statements=32)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA query_only=1')
+    conn.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache, reused across refreshes
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
+    return conn
+
 
 def clear_screen():
     """Clear terminal screen"""
     os.system('cls' if os.name == 'nt' else 'clear')
 
 
-def show_signals_dashboard(signal_date: str = None, watch_mode: bool = False):
+def show_signals_dashboard(conn: sqlite3.Connection, signal_date: str = None, watch_mode: bool = False):
     """Display today's active signals dashboard"""
-    
-    if watch_mode:
-        clear_screen()
-    
+    # Render into memory first: one terminal write per refresh, and in watch
+    # mode the screen is only cleared once the new frame is ready
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            _print_signals_dashboard(conn, signal_date, watch_mode)
+    finally:
+        if watch_mode:
+            clear_screen()
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
+
+def _print_signals_dashboard(conn: sqlite3.Connection, signal_date: str, watch_mode: bool):
+    """Print the dashboard to stdout"""
     if not signal_date:
         signal_date = datetime.now().date().isoformat()
     
@@ -38,72 +91,73 @@ def show_signals_dashboard(signal_date: str = None, watch_mode: bool = False):
     print(f'ACTIVE SIGNALS DASHBOARD - {signal_date}')
     print('=' * 80)
     
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Get valid signals for the date (score > 0)
-    cursor.execute('''
-        SELECT id, symbol, signal_date, score, pattern, price, reason, executed, created_at 
-        FROM signal_history 
-        WHERE signal_date = ? AND score > 0 
-        ORDER BY score DESC, created_at DESC
-    ''', (signal_date,))
-    valid_signals = cursor.fetchall()
-    
-    print(f'\n📊 VALID SIGNALS: {len(valid_signals)}')
+    # Per-pattern breakdown carries the totals, so the signal rows can be streamed
+    pattern_breakdown = []
+    open_positions = valid_count = executed_count = 0
+    for row in conn.execute(SQL_SIGNAL_SUMMARY, (signal_date,)):
+        if row['kind'] == 'open_positions':
+            open_positions = row['count']
+            continue
+        pattern_breakdown.append(row)
+        valid_count += row['count']
+        executed_count += row['executed_count']
+    pending_count = valid_count - executed_count
+    
+    print(f'\n📊 VALID SIGNALS: {valid_count}')
     print('-' * 80)
     
-    if valid_signals:
-        # Show all signals
-        for i, signal in enumerate(valid_signals, 1):
-            status = '✅ EXECUTED' if signal['executed'] else '⏳ PENDING'
+    if valid_count:
+        # Show all signals, keeping the first few pending ones for the summary
+        top_pending = []
+        for i, signal in enumerate(conn.execute(SQL_VALID_SIGNALS, (signal_date,)), 1):
+            executed, score = signal['executed'], signal['score']
+            status = '✅ EXECUTED' if executed else '⏳ PENDING'
             
             # Determine pattern type
             pattern = signal['pattern'] or 'Unknown'
-            if any(p in pattern for p in ['Engulfing', 'Piercing', 'Tweezer']):
+            if _PATTERN_RE.search(pattern):
                 pattern_type = '🎯 Pattern'
-            elif 'EMA21' in pattern or 'SMA50' in pattern:
+            elif _TOUCH_RE.search(pattern):
                 pattern_type = '📍 Touch'
             else:
                 pattern_type = '❓ Other'
             
             # Score indicator
-            if signal['score'] >= 5:
+            if score >= 5:
                 score_indicator = '🌟🌟🌟'
-            elif signal['score'] >= 4:
+            elif score >= 4:
                 score_indicator = '🌟🌟'
-            elif signal['score'] >= 3:
+            elif score >= 3:
                 score_indicator = '🌟'
             else:
                 score_indicator = '⭐'
             
-            print(f'{i:2d}. {signal["symbol"]:<6} | Score: {signal["score"]:4.1f} {score_indicator} | {pattern_type:<12} | {status}')
+            print(f'{i:2d}. {signal["symbol"]:<6} | Score: {score:4.1f} {score_indicator} | {pattern_type:<12} | {status}')
             print(f'    Pattern: {pattern}')
             print(f'    Price: ${signal["price"]:.2f} | Created: {signal["created_at"]}')
+            
+            if not executed and len(top_pending) < 5:
+                top_pending.append(signal)
         
         # Show execution summary
         print('\n' + '=' * 80)
         print('EXECUTION SUMMARY')
         print('-' * 80)
         
-        pending_signals = [s for s in valid_signals if not s['executed']]
-        executed_signals = [s for s in valid_signals if s['executed']]
-        
-        print(f'\n✅ Executed: {len(executed_signals)}')
-        print(f'⏳ Pending: {len(pending_signals)}')
+        print(f'\n✅ Executed: {executed_count}')
+        print(f'⏳ Pending: {pending_count}')
         
-        if pending_signals:
+        if pending_count:
             print('\n🎯 TOP PENDING SIGNALS (by Score):')
             print('-' * 80)
             
-            for i, signal in enumerate(pending_signals[:5], 1):
+            for i, signal in enumerate(top_pending, 1):
                 pattern = signal['pattern'] or 'Unknown'
-                pattern_type = 'Pattern' if any(p in pattern for p in ['Engulfing', 'Piercing', 'Tweezer']) else 'Touch'
+                pattern_type = 'Pattern' if _PATTERN_RE.search(pattern) else 'Touch'
                 print(f'{i}. {signal["symbol"]:<6} (Score: {signal["score"]:.1f}) - {pattern_type}: {pattern}')
             
-            if len(pending_signals) > 5:
-                print(f'   ... and {len(pending_signals) - 5} more')
+            if pending_count > 5:
+                print(f'   ... and {pending_count - 5} more')
         else:
             print('\n✅ All signals have been executed or no pending signals!')
         
@@ -112,34 +166,20 @@ def show_signals_dashboard(signal_date: str = None, watch_mode: bool = False):
         print('SIGNAL TYPE BREAKDOWN')
         print('-' * 80)
         
-        cursor.execute('''
-            SELECT pattern, COUNT(*) as count, AVG(score) as avg_score
-            FROM signal_history 
-            WHERE signal_date = ? AND score > 0 
-            GROUP BY pattern
-            ORDER BY count DESC
-        ''', (signal_date,))
-        pattern_breakdown = cursor.fetchall()
-        
         for row in pattern_breakdown:
             print(f'   {row["pattern"]:<20} : {row["count"]:2d} signals (avg score: {row["avg_score"]:.1f})')
     
     else:
         print('❌ No valid signals detected for this date yet.')
     
-    # Check current positions and limits
-    cursor.execute('SELECT COUNT(*) FROM positions WHERE status = "OPEN"')
-    open_positions = cursor.fetchone()['COUNT(*)']
-    
+    # Current positions and limits
     print('\n' + '=' * 80)
     print('CURRENT STATUS')
     print('-' * 80)
     print(f'   💼 Open Positions: {open_positions}/10 (max)')
-    print(f'   📊 Valid Signals Today: {len(valid_signals)}')
-    print(f'   ⏳ Pending Signals: {len([s for s in valid_signals if not s["executed"]])}')
-    print(f'   ✅ Executed Signals: {len([s for s in valid_signals if s["executed"]])}')
-    
-    conn.close()
+    print(f'   📊 Valid Signals Today: {valid_count}')
+    print(f'   ⏳ Pending Signals: {pending_count}')
+    print(f'   ✅ Executed Signals: {executed_count}')
     
     if watch_mode:
         print('\n' + '=' * 80)
@@ -166,15 +206,21 @@ def main():
         print('   Make sure you run this script from the Single_Buy directory')
         return
     
-    if args.watch:
-        try:
-            while True:
-                show_signals_dashboard(signal_date=args.date, watch_mode=True)
-                time.sleep(60)
-        except KeyboardInterrupt:
-            print('\n\n✅ Watch mode stopped')
-    else:
-        show_signals_dashboard(signal_date=args.date)
+    conn = open_connection()
+    try:
+        if args.watch:
+            try:
+                while True:
+                    # Re-evaluated each refresh so the dashboard rolls over at midnight
+                    signal_date = args.date or datetime.now().date().isoformat()
+                    show_signals_dashboard(conn, signal_date=signal_date, watch_mode=True)
+                    time.sleep(60)
+            except KeyboardInterrupt:
+                print('\n\n✅ Watch mode stopped')
+        else:
+            show_signals_dashboard(conn, signal_date=args.date)
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
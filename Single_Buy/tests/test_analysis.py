@@ -19,6 +19,10 @@ def main():
     print('=== TESTING INDIVIDUAL STOCK ANALYSIS ===')
     print()
 
+    # Fetch all daily bars concurrently up front; the analyzer keeps per-symbol
+    # state and is not thread-safe, so the analysis below stays sequential
+    bot.analyzer.data_fetcher.prefetch_daily_bars(test_stocks, days=365, max_workers=len(test_stocks))
+
     for symbol in test_stocks:
         print(f'--- Analyzing {symbol} ---')
         try:
@@ -8,16 +8,31 @@ import logging
 # Set up minimal logging
 logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
 
+# Parsed once and shared by every test below; tests that change a setting restore it
+_CONFIG = ConfigManager('config/config.json')
+
+# One in-memory connection shared by every test below (opening it dominates
+# these tests); utilization is stubbed per test, so no real positions are needed
+_DB = PositionDatabase(':memory:')
+
+def _reset_db():
+    """Drop per-test monkeypatches and rows from the shared database"""
+    vars(_DB).pop('get_utilization_usd', None)
+    with _DB.conn:
+        _DB.conn.execute('DELETE FROM positions')
+
 def test_capital_conservation_mode():
     """Test capital conservation mode activation"""
     print('🧪 Testing Capital Conservation Mode...')
 
-    try:
-        config = ConfigManager('config/config.json')
-        db = PositionDatabase()
+    # Enable conservation mode for this test (restored below)
+    trading_rules = _CONFIG.config['trading_rules']
+    original_conservation_mode = trading_rules.get('capital_conservation_mode')
+    trading_rules['capital_conservation_mode'] = True
 
-        # Enable conservation mode for this test
-        config.config['trading_rules']['capital_conservation_mode'] = True
+    try:
+        config = _CONFIG
+        db = _DB
 
         # Mock trading client
         class MockTradingClient:
@@ -42,23 +57,12 @@ def test_capital_conservation_mode():
         # We need utilization > 35% (70% of 50% max)
         # Let's simulate 40% utilization
 
-        original_get_open_positions = db.get_open_positions
-
-        def mock_get_open_positions(symbol=None):
-            # Return positions that total $40k (40% utilization)
-            return [
-                {'symbol': 'MOCK1', 'entry_price': 100.0, 'remaining_qty': 200, 'stop_loss': 90.0},  # $20k
-                {'symbol': 'MOCK2', 'entry_price': 100.0, 'remaining_qty': 200, 'stop_loss': 90.0},  # $20k
-            ]
-
-        db.get_open_positions = mock_get_open_positions
+        # Open positions totalling $40k (40% utilization)
+        db.get_utilization_usd = lambda symbol=None: 40000.0
 
         shares, amount = position_manager.calculate_position_size('CONSERVATION_TEST', 100.0)
         print(f'✅ High utilization (40%): {shares} shares = ${amount:.2f} (conservation active)')
 
-        # Restore original method
-        db.get_open_positions = original_get_open_positions
-
         print('✅ Capital Conservation Mode test passed')
         return True
 
@@ -68,13 +72,20 @@ def test_capital_conservation_mode():
         traceback.print_exc()
         return False
 
+    finally:
+        _reset_db()
+        if original_conservation_mode is None:
+            trading_rules.pop('capital_conservation_mode', None)
+        else:
+            trading_rules['capital_conservation_mode'] = original_conservation_mode
+
 def test_utilization_limits():
     """Test utilization limit enforcement"""
     print('🧪 Testing Utilization Limit Enforcement...')
 
     try:
-        config = ConfigManager('config/config.json')
-        db = PositionDatabase()
+        config = _CONFIG
+        db = _DB
 
         # Mock trading client
         class MockTradingClient:
@@ -97,17 +108,9 @@ def test_utilization_limits():
             return False
 
         # Now test with utilization that would exceed limit
-        original_get_open_positions = db.get_open_positions
-
-        def mock_high_util_positions(symbol=None):
-            # Return positions that total $45k (45% utilization)
-            # A $10k trade would bring total to 55% - should be blocked
-            return [
-                {'symbol': 'HIGH1', 'entry_price': 100.0, 'remaining_qty': 225, 'stop_loss': 90.0},  # $22.5k
-                {'symbol': 'HIGH2', 'entry_price': 100.0, 'remaining_qty': 225, 'stop_loss': 90.0},  # $22.5k
-            ]
-
-        db.get_open_positions = mock_high_util_positions
+        # Open positions totalling $45k (45% utilization)
+        # A $10k trade would bring total to 55% - should be blocked
+        db.get_utilization_usd = lambda symbol=None: 45000.0
 
         shares, amount = position_manager.calculate_position_size('BLOCKED_TEST', 100.0)
         if shares == 0:
@@ -116,9 +119,6 @@ def test_utilization_limits():
             print(f'❌ Trade incorrectly allowed: {shares} shares = ${amount:.2f}')
             return False
 
-        # Restore original method
-        db.get_open_positions = original_get_open_positions
-
         print('✅ Utilization Limit test passed')
         return True
 
@@ -128,13 +128,16 @@ def test_utilization_limits():
         traceback.print_exc()
         return False
 
+    finally:
+        _reset_db()
+
 def test_dynamic_position_limits():
     """Test dynamic position limits"""
     print('🧪 Testing Dynamic Position Limits...')
 
     try:
-        config = ConfigManager('config/config.json')
-        db = PositionDatabase()
+        config = _CONFIG
+        db = _DB
 
         # Mock trading client
         class MockTradingClient:
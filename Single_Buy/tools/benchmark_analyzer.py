@@ -7,7 +7,8 @@ import os
 # Add parent directory to path to import the bot module
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from rajat_alpha_v67_single import RajatAlphaTradingBot
+from rajat_alpha_v67_single import ConfigManager, MarketDataFetcher
+from alpaca.data.historical import StockHistoricalDataClient
 import pandas as pd
 from datetime import datetime, timedelta
 
@@ -16,23 +17,30 @@ def test_benchmark_data():
     print("Testing SPY and QQQ data fetching...")
 
     try:
-        # Initialize bot
-        bot = RajatAlphaTradingBot(config_path='config/config.json')
+        # Only the data fetcher is needed; skip the full bot (DB, trading client)
+        config = ConfigManager('config/config.json')
+        data_client = StockHistoricalDataClient(config.get('api', 'key_id'),
+                                                config.get('api', 'secret_key'))
+        data_fetcher = MarketDataFetcher(data_client)
 
         # Test symbols
         symbols = ['SPY', 'QQQ']
 
+        # Fetch both concurrently into the fetcher cache; the loop below reads from it
+        data_fetcher.prefetch_daily_bars(symbols, days=30, max_workers=len(symbols))
+
         for symbol in symbols:
             print(f"\n--- Testing {symbol} ---")
 
             try:
                 # Get data using the same method as the bot
-                df = bot.data_fetcher.get_daily_bars(symbol, days=30)
+                df = data_fetcher.get_daily_bars(symbol, days=30)
 
                 if df is not None and not df.empty:
                     print(f"✅ {symbol}: Successfully fetched {len(df)} rows")
-                    print(f"   Date range: {df.index.min()} to {df.index.max()}")
-                    print(f"   Latest price: {df['close'].iloc[-1]:.2f}")
+                    # Bars come back in date order, so first/last are the range ends
+                    print(f"   Date range: {df.index[0]} to {df.index[-1]}")
+                    print(f"   Latest price: {df['close'].to_numpy()[-1]:.2f}")
                     print(f"   Columns: {list(df.columns)}")
 
                     # Check for required columns
@@ -51,7 +59,7 @@ def test_benchmark_data():
         print("\n--- Test Complete ---")
 
     except Exception as e:
-        print(f"❌ Bot initialization failed: {str(e)}")
+        print(f"❌ Data fetcher initialization failed: {str(e)}")
 
 if __name__ == "__main__":
     test_benchmark_data()
\ No newline at end of file
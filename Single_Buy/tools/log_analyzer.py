@@ -8,45 +8,96 @@ import json
 import re
 import sys
 import os
+import functools
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from typing import Dict, List, Tuple, Optional
 import argparse
 from pathlib import Path
 
+try:
+    # Optional: several times faster than json.loads on the per-line path;
+    # its JSONDecodeError subclasses json.JSONDecodeError, so handlers are shared
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Per-line patterns, compiled once
+_JSON_EMBED_RE = re.compile(r'\{.*\}')
+# Old-style format: 2026-02-16 21:05:57 | INFO | Message
+_OLD_FORMAT_RE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \| (\w+) \| (.+)$')
+
+_TIMESTAMP_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S.%fZ',  # ISO format with microseconds
+    '%Y-%m-%dT%H:%M:%SZ',      # ISO format
+    '%Y-%m-%d %H:%M:%S',       # Simple format
+    '%Y-%m-%d %H:%M:%S.%f',    # Simple with microseconds
+)
+# (date/time separator, has fraction) -> the only format that can match that shape
+_FORMAT_BY_SHAPE = {
+    ('T', True): _TIMESTAMP_FORMATS[0],
+    ('T', False): _TIMESTAMP_FORMATS[1],
+    (' ', False): _TIMESTAMP_FORMATS[2],
+    (' ', True): _TIMESTAMP_FORMATS[3],
+}
+
+
+@functools.lru_cache(maxsize=65536)
+def _parse_timestamp(ts_str: str) -> Optional[datetime]:
+    """strptime over _TIMESTAMP_FORMATS, cached per distinct timestamp string"""
+    # The string's shape picks the format, so the usual case is one strptime
+    # call instead of raising through the earlier formats; anything unusual
+    # falls back to trying each format in order
+    likely = _FORMAT_BY_SHAPE.get((ts_str[10:11], '.' in ts_str))
+    if likely:
+        try:
+            return datetime.strptime(ts_str, likely)
+        except ValueError:
+            pass
+    for fmt in _TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(ts_str, fmt)
+        except ValueError:
+            continue
+    return None
+
 
 class LogAnalyzer:
     """Analyzes trading bot logs and generates comprehensive reports"""
     
     def __init__(self, log_file: str = "logs/rajat_alpha_v67.log"):
         self.log_file = log_file
-        self.entries = []
+        # Matched entries are aggregated as they are read rather than kept;
+        # only errors and warnings are retained for the detailed reports
+        self.entry_count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
         self.errors = []
         self.warnings = []
-        self.trades = []
-        self.signals = []
-        self.positions = []
+        self.error_categories = defaultdict(list)
+        self.warning_categories = defaultdict(list)
+        self.daily = {}
         self.stats = defaultdict(int)
         
     def parse_log_line(self, line: str) -> Optional[Dict]:
         """Parse a JSON log line"""
         try:
             # Try to parse as JSON
-            if line.strip().startswith('{'):
-                return json.loads(line)
+            if line.lstrip()[:1] == '{':
+                return _json_loads(line)
             # Try to extract JSON from line
-            match = re.search(r'\{.*\}', line)
+            match = _JSON_EMBED_RE.search(line)
             if match:
-                return json.loads(match.group())
+                return _json_loads(match.group())
         except json.JSONDecodeError:
             pass
         
         # Fallback: parse old-style log format
-        # Format: 2026-02-16 21:05:57 | INFO | Message
-        match = re.match(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \| (\w+) \| (.+)$', line.strip())
+        match = _OLD_FORMAT_RE.match(line.strip())
         if match:
             return {
                 'timestamp': match.group(1),
@@ -58,19 +109,9 @@ class LogAnalyzer:
     
     def parse_timestamp(self, ts_str: str) -> Optional[datetime]:
         """Parse timestamp from various formats"""
-        formats = [
-            '%Y-%m-%dT%H:%M:%S.%fZ',  # ISO format with microseconds
-            '%Y-%m-%dT%H:%M:%SZ',      # ISO format
-            '%Y-%m-%d %H:%M:%S',       # Simple format
-            '%Y-%m-%d %H:%M:%S.%f',    # Simple with microseconds
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(ts_str, fmt)
-            except (ValueError, TypeError):
-                continue
-        return None
+        if not isinstance(ts_str, str):
+            return None
+        return _parse_timestamp(ts_str)
     
     def analyze_date_range(self, start_date: str, end_date: str, max_lines: int = None):
         """Analyze logs within a date range"""
@@ -80,8 +121,17 @@ class LogAnalyzer:
         start_dt = datetime.strptime(start_date, '%Y-%m-%d')
         end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
         
+        # Year-month prefixes of every month the range touches, for the quick
+        # substring filter below (a range can span several months)
+        month_prefixes = []
+        month = start_dt.replace(day=1)
+        while month < end_dt:
+            month_prefixes.append(month.strftime('%Y-%m'))
+            month = (month + timedelta(days=32)).replace(day=1)
+        
         lines_processed = 0
         lines_matched = 0
+        parse_log_line = self.parse_log_line  # bound once, called per line
         
         with open(self.log_file, 'r', encoding='utf-8') as f:
             for line in f:
@@ -90,10 +140,10 @@ class LogAnalyzer:
                     break
                 
                 # Quick date filter before parsing
-                if not re.search(f'{start_date[:7]}', line):  # Match year-month
+                if not any(prefix in line for prefix in month_prefixes):
                     continue
                 
-                entry = self.parse_log_line(line)
+                entry = parse_log_line(line)
                 if not entry:
                     continue
                 
@@ -104,23 +154,54 @@ class LogAnalyzer:
                 
                 lines_matched += 1
                 entry['parsed_timestamp'] = ts
-                self.entries.append(entry)
+                self.entry_count += 1
+                if self.first_timestamp is None:
+                    self.first_timestamp = ts
+                self.last_timestamp = ts
                 
                 # Categorize entries
                 level = entry.get('level', 'INFO')
                 message = entry.get('message', '')
                 
+                # Daily stats (keyed by date, formatted in generate_daily_stats)
+                day = ts.date()
+                daily = self.daily.get(day)
+                if daily is None:
+                    daily = self.daily[day] = {
+                        'errors': 0,
+                        'warnings': 0,
+                        'trades': 0,
+                        'signals': 0,
+                        'error_types': Counter(),
+                        'warning_types': Counter()
+                    }
+                
                 if level == 'ERROR':
                     self.errors.append(entry)
+                    self.error_categories[self._error_category(message)].append(entry)
+                    daily['errors'] += 1
+                    if 'API' in message:
+                        daily['error_types']['API'] += 1
+                    elif 'Database' in message:
+                        daily['error_types']['Database'] += 1
+                    elif 'Trading' in message:
+                        daily['error_types']['Trading'] += 1
                 elif level == 'WARNING':
                     self.warnings.append(entry)
+                    self.warning_categories[self._warning_category(message)].append(entry)
+                    daily['warnings'] += 1
+                
+                if 'BUY' in message or 'SELL' in message or 'EXIT' in message:
+                    daily['trades'] += 1
+                if 'SIGNAL GENERATED' in message:
+                    daily['signals'] += 1
                 
                 # Extract trading activities
                 if 'BUY' in message or 'POSITION OPENED' in message:
-                    self.trades.append(entry)
+                    self.stats['total_trades'] += 1
                     self.stats['total_buys'] += 1
                 elif 'SELL' in message or 'EXIT' in message:
-                    self.trades.append(entry)
+                    self.stats['total_trades'] += 1
                     if 'FULL EXIT' in message:
                         self.stats['full_exits'] += 1
                     elif 'Partial Exit' in message:
@@ -128,15 +209,10 @@ class LogAnalyzer:
                 
                 # Extract signals
                 if 'SIGNAL GENERATED' in message or '✅ VALID SIGNAL' in message:
-                    self.signals.append(entry)
                     self.stats['signals_generated'] += 1
                 elif '❌' in message and 'Signal failed' in message:
                     self.stats['signals_rejected'] += 1
                 
-                # Position tracking
-                if 'Position Summary' in message or 'Active Positions' in message:
-                    self.positions.append(entry)
-                
                 # Progress indicator
                 if lines_processed % 100000 == 0:
                     print(f"  Processed {lines_processed:,} lines...", end='\r')
@@ -144,45 +220,39 @@ class LogAnalyzer:
         print(f"\n✅ Processed {lines_processed:,} lines, matched {lines_matched:,} entries")
         return lines_matched
     
+    @staticmethod
+    def _error_category(msg: str) -> str:
+        """Category name for an error message"""
+        if 'API' in msg or 'HTTP' in msg or 'Request' in msg:
+            return 'API Errors'
+        elif 'Database' in msg or 'SQL' in msg or 'db' in msg:
+            return 'Database Errors'
+        elif 'Market' in msg or 'Trading' in msg or 'Order' in msg:
+            return 'Trading Errors'
+        elif 'Data' in msg or 'fetch' in msg or 'download' in msg:
+            return 'Data Errors'
+        return 'Other Errors'
+    
+    @staticmethod
+    def _warning_category(msg: str) -> str:
+        """Category name for a warning message"""
+        if 'Capital' in msg or 'limit' in msg or 'exceeded' in msg:
+            return 'Capital Limit Warnings'
+        elif 'Position' in msg or 'overselling' in msg:
+            return 'Position Warnings'
+        elif 'Signal' in msg or 'validation' in msg:
+            return 'Signal Warnings'
+        elif 'Market' in msg or 'closed' in msg:
+            return 'Market Status Warnings'
+        return 'Other Warnings'
+    
     def categorize_errors(self) -> Dict[str, List[Dict]]:
-        """Categorize errors by type"""
-        categories = defaultdict(list)
-        
-        for error in self.errors:
-            msg = error.get('message', '')
-            
-            if 'API' in msg or 'HTTP' in msg or 'Request' in msg:
-                categories['API Errors'].append(error)
-            elif 'Database' in msg or 'SQL' in msg or 'db' in msg:
-                categories['Database Errors'].append(error)
-            elif 'Market' in msg or 'Trading' in msg or 'Order' in msg:
-                categories['Trading Errors'].append(error)
-            elif 'Data' in msg or 'fetch' in msg or 'download' in msg:
-                categories['Data Errors'].append(error)
-            else:
-                categories['Other Errors'].append(error)
-        
-        return dict(categories)
+        """Categorize errors by type (grouped while analyzing)"""
+        return dict(self.error_categories)
     
     def categorize_warnings(self) -> Dict[str, List[Dict]]:
-        """Categorize warnings by type"""
-        categories = defaultdict(list)
-        
-        for warning in self.warnings:
-            msg = warning.get('message', '')
-            
-            if 'Capital' in msg or 'limit' in msg or 'exceeded' in msg:
-                categories['Capital Limit Warnings'].append(warning)
-            elif 'Position' in msg or 'overselling' in msg:
-                categories['Position Warnings'].append(warning)
-            elif 'Signal' in msg or 'validation' in msg:
-                categories['Signal Warnings'].append(warning)
-            elif 'Market' in msg or 'closed' in msg:
-                categories['Market Status Warnings'].append(warning)
-            else:
-                categories['Other Warnings'].append(warning)
-        
-        return dict(categories)
+        """Categorize warnings by type (grouped while analyzing)"""
+        return dict(self.warning_categories)
     
     def generate_summary(self) -> str:
         """Generate human-readable summary report"""
@@ -193,13 +263,13 @@ class LogAnalyzer:
         report.append("")
         
         # Date range
-        if self.entries:
-            first_dt = self.entries[0]['parsed_timestamp']
-            last_dt = self.entries[-1]['parsed_timestamp']
+        if self.entry_count:
+            first_dt = self.first_timestamp
+            last_dt = self.last_timestamp
             report.append(f"📅 Date Range: {first_dt.strftime('%Y-%m-%d %H:%M')} to {last_dt.strftime('%Y-%m-%d %H:%M')}")
             report.append(f"⏱️  Duration: {(last_dt - first_dt).days} days, {(last_dt - first_dt).seconds // 3600} hours")
         
-        report.append(f"📝 Total Log Entries: {len(self.entries):,}")
+        report.append(f"📝 Total Log Entries: {self.entry_count:,}")
         report.append("")
         
         # Error Summary
@@ -311,43 +381,8 @@ class LogAnalyzer:
         print(f"✅ CSV report saved to: {output_file}")
     
     def generate_daily_stats(self) -> Dict[str, Dict]:
-        """Generate statistics grouped by day"""
-        daily = defaultdict(lambda: {
-            'errors': 0,
-            'warnings': 0,
-            'trades': 0,
-            'signals': 0,
-            'error_types': Counter(),
-            'warning_types': Counter()
-        })
-        
-        for entry in self.entries:
-            ts = entry.get('parsed_timestamp')
-            if not ts:
-                continue
-            
-            day = ts.strftime('%Y-%m-%d')
-            level = entry.get('level', '')
-            
-            if level == 'ERROR':
-                daily[day]['errors'] += 1
-                msg = entry.get('message', '')
-                if 'API' in msg:
-                    daily[day]['error_types']['API'] += 1
-                elif 'Database' in msg:
-                    daily[day]['error_types']['Database'] += 1
-                elif 'Trading' in msg:
-                    daily[day]['error_types']['Trading'] += 1
-            elif level == 'WARNING':
-                daily[day]['warnings'] += 1
-            
-            msg = entry.get('message', '')
-            if 'BUY' in msg or 'SELL' in msg or 'EXIT' in msg:
-                daily[day]['trades'] += 1
-            if 'SIGNAL GENERATED' in msg:
-                daily[day]['signals'] += 1
-        
-        return dict(daily)
+        """Generate statistics grouped by day (aggregated while analyzing)"""
+        return {day.strftime('%Y-%m-%d'): stats for day, stats in self.daily.items()}
     
     def print_daily_table(self):
         """Print daily statistics as a table"""
@@ -431,8 +466,8 @@ Examples:
     print(f"\n✅ Analysis complete!")
     print(f"   Errors: {len(analyzer.errors):,}")
     print(f"   Warnings: {len(analyzer.warnings):,}")
-    print(f"   Trades: {len(analyzer.trades):,}")
-    print(f"   Signals: {len(analyzer.signals):,}")
+    print(f"   Trades: {analyzer.stats.get('total_trades', 0):,}")
+    print(f"   Signals: {analyzer.stats.get('signals_generated', 0):,}")
 
 
 if __name__ == '__main__':
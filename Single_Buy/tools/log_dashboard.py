@@ -535,10 +535,10 @@ def analyze():
             ]
         
         response = {
-            'total_entries': len(analyzer.entries),
+            'total_entries': analyzer.entry_count,
             'total_errors': len(analyzer.errors),
             'total_warnings': len(analyzer.warnings),
-            'total_trades': len(analyzer.trades),
+            'total_trades': analyzer.stats.get('total_trades', 0),
             'signals_generated': analyzer.stats.get('signals_generated', 0),
             'signals_rejected': analyzer.stats.get('signals_rejected', 0),
             'total_buys': analyzer.stats.get('total_buys', 0),
@@ -5,6 +5,10 @@ Stock Analysis Report - Available for Trade Based on Ratings
 import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
+from itertools import groupby
+
+# Score range labels, indexed by the bucket number computed in SQL
+SCORE_BUCKETS = ('High (4.0+)', 'Medium-High (3.0-3.9)', 'Medium (2.0-2.9)', 'Low (0-1.9)')
 
 def main():
     # Connect to database
@@ -12,19 +16,24 @@ def main():
     cursor = conn.cursor()
 
     # Get today's signals (last 24 hours)
-    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-    today = datetime.now().strftime('%Y-%m-%d')
+    now = datetime.now()
+    yesterday = (now - timedelta(days=1)).strftime('%Y-%m-%d')
+    today = now.strftime('%Y-%m-%d')
 
     print('=== RECENT SIGNAL ANALYSIS (Last 24 hours) ===')
     print(f'Date range: {yesterday} to {today}')
     print()
 
-    # Get all signals from today
+    # Get all signals from today, bucketed by score range and sorted within each range
     cursor.execute('''
-        SELECT symbol, score, pattern, executed, created_at
+        SELECT CASE WHEN score >= 4.0 THEN 0
+                    WHEN score >= 3.0 THEN 1
+                    WHEN score >= 2.0 THEN 2
+                    ELSE 3 END AS bucket,
+               symbol, score, pattern, executed
         FROM signal_history
         WHERE created_at >= ?
-        ORDER BY score DESC, created_at DESC
+        ORDER BY bucket, score DESC, created_at DESC
     ''', (yesterday,))
 
     signals = cursor.fetchall()
@@ -33,31 +42,13 @@ def main():
         print(f'Found {len(signals)} signals analyzed:')
         print()
 
-        # Group by score ranges
-        score_ranges = {
-            'High (4.0+)': [],
-            'Medium-High (3.0-3.9)': [],
-            'Medium (2.0-2.9)': [],
-            'Low (0-1.9)': []
-        }
-
-        for symbol, score, pattern, executed, created_at in signals:
-            if score >= 4.0:
-                score_ranges['High (4.0+)'].append((symbol, score, pattern, executed))
-            elif score >= 3.0:
-                score_ranges['Medium-High (3.0-3.9)'].append((symbol, score, pattern, executed))
-            elif score >= 2.0:
-                score_ranges['Medium (2.0-2.9)'].append((symbol, score, pattern, executed))
-            else:
-                score_ranges['Low (0-1.9)'].append((symbol, score, pattern, executed))
-
-        for range_name, stocks in score_ranges.items():
-            if stocks:
-                print(f'{range_name}: {len(stocks)} stocks')
-                for symbol, score, pattern, executed in sorted(stocks, key=lambda x: x[1], reverse=True):
-                    status = 'EXECUTED' if executed else 'NOT EXECUTED'
-                    print(f'  {symbol}: Score {score:.1f}, Pattern: {pattern}, Status: {status}')
-                print()
+        for bucket, rows in groupby(signals, key=lambda row: row[0]):
+            stocks = list(rows)
+            print(f'{SCORE_BUCKETS[bucket]}: {len(stocks)} stocks')
+            for _, symbol, score, pattern, executed in stocks:
+                status = 'EXECUTED' if executed else 'NOT EXECUTED'
+                print(f'  {symbol}: Score {score:.1f}, Pattern: {pattern}, Status: {status}')
+            print()
     else:
         print('No signals found in the last 24 hours.')
         print()